@@ -0,0 +1,196 @@
+import pickle
+import re
+import unicodedata
+import zlib
+
+import numpy as np
+
+
+MINHASH_PRIME = (1 << 31) - 1
+
+# Mots dont l'ajout ou l'absence ne change pas le sens d'une question MedQuAD.
+# Une quasi-correspondance n'est acceptée que si les mots qui diffèrent en font
+# tous partie : "Diabetes Type 1" ne doit jamais répondre à "Diabetes Type 2".
+FILLER_WORDS = frozenset({
+    "a", "an", "the", "is", "are", "was", "were", "be", "of", "for", "to", "in",
+    "on", "and", "or", "do", "does", "can", "what", "which", "about", "please",
+    "tell", "me", "my", "i", "you", "there", "any",
+})
+
+
+def normalize_question(question: str) -> str:
+    """
+    Normalise une question pour la comparaison exacte.
+
+    Minuscules, accents retirés, ponctuation supprimée et espaces compactés :
+    "What is (are) Glaucoma ?" devient "what is are glaucoma".
+    """
+    text = unicodedata.normalize("NFKD", question)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return " ".join(text.split())
+
+
+def shingles(normalized: str, size: int = 4) -> set[str]:
+    """Découpe une question normalisée en n-grammes de caractères."""
+    if len(normalized) <= size:
+        return {normalized}
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+
+def differs_only_by_filler(normalized: str, other: str) -> bool:
+    """Vrai si les deux questions normalisées ne diffèrent que par des mots vides."""
+    return (set(normalized.split()) ^ set(other.split())) <= FILLER_WORDS
+
+
+class AnswerIndex:
+    """
+    Index en mémoire des questions MedQuAD pour répondre sans encodeur ni base.
+
+    - un dictionnaire question normalisée -> lignes pour les correspondances exactes ;
+    - des signatures MinHash regroupées en bandes LSH pour les quasi-doublons,
+      confirmés ensuite par differs_only_by_filler.
+
+    Les compteurs de consultation permettent de mesurer la part du trafic absorbée.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, near_threshold: float = 0.5, seed: int = 42):
+        if num_perm % bands:
+            raise ValueError("num_perm doit être un multiple de bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.near_threshold = near_threshold
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, MINHASH_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, MINHASH_PRIME, size=num_perm, dtype=np.uint64)
+
+        self.records: list[dict] = []
+        self.exact: dict[str, list[int]] = {}
+        self.signatures = np.empty((0, num_perm), dtype=np.uint64)
+        self.buckets: list[dict[bytes, list[int]]] = [{} for _ in range(bands)]
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.lookups = 0
+        self.exact_hits = 0
+        self.near_hits = 0
+
+    def signature(self, normalized: str) -> np.ndarray:
+        """Calcule la signature MinHash d'une question normalisée."""
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) % MINHASH_PRIME for s in shingles(normalized)),
+            dtype=np.uint64,
+        )
+        permuted = (np.outer(hashes, self._a) + self._b) % MINHASH_PRIME
+        return permuted.min(axis=0)
+
+    def _band_keys(self, signature: np.ndarray) -> list[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def add_records(self, records: list[dict]) -> None:
+        """
+        Ajoute des lignes de qa_table à l'index.
+
+        Chaque ligne doit contenir au moins question, answer, source et focus_area
+        (id optionnel ; distance pour une réponse issue de la recherche vectorielle,
+        cf. le préchauffage de api.py). L'ordre d'insertion départage les doublons.
+        """
+        new_signatures = []
+        for record in records:
+            normalized = normalize_question(str(record.get("question", "")))
+            if not normalized:
+                continue
+            position = len(self.records)
+            self.records.append({
+                "id": record.get("id"),
+                "question": normalized,
+                "answer": record["answer"],
+                "source": record.get("source"),
+                "focus_area": record.get("focus_area"),
+                "distance": record.get("distance", 0.0),
+            })
+            self.exact.setdefault(normalized, []).append(position)
+
+            signature = self.signature(normalized)
+            new_signatures.append(signature)
+            for band, key in enumerate(self._band_keys(signature)):
+                self.buckets[band].setdefault(key, []).append(position)
+
+        if new_signatures:
+            self.signatures = np.vstack([self.signatures, np.array(new_signatures, dtype=np.uint64)])
+
+    @staticmethod
+    def _matches(record: dict, focus_area: str | None, source: str | None) -> bool:
+        if focus_area and record["focus_area"] != focus_area:
+            return False
+        if source and record["source"] != source:
+            return False
+        return True
+
+    def lookup(self, question: str, focus_area: str | None = None,
+               source: str | None = None, near: bool = True) -> tuple[dict, str, float] | None:
+        """
+        Cherche une réponse précalculée pour la question.
+
+        Args:
+            near (bool): Cherche aussi les quasi-doublons (MinHash/LSH) si la
+                question n'a pas de correspondance exacte.
+
+        Returns:
+            (ligne, "exact" | "near", similarité de Jaccard estimée) ou None.
+        """
+        self.lookups += 1
+        normalized = normalize_question(question)
+        if not normalized or not self.records:
+            return None
+
+        for position in self.exact.get(normalized, []):
+            record = self.records[position]
+            if self._matches(record, focus_area, source):
+                self.exact_hits += 1
+                return record, "exact", 1.0
+        if not near:
+            return None
+
+        signature = self.signature(normalized)
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(self.buckets[band].get(key, ()))
+        if not candidates:
+            return None
+
+        candidates = sorted(candidates)
+        similarities = (self.signatures[candidates] == signature).mean(axis=1)
+        for rank in np.argsort(-similarities, kind="stable"):
+            similarity = float(similarities[rank])
+            if similarity < self.near_threshold:
+                break
+            record = self.records[candidates[rank]]
+            if not differs_only_by_filler(normalized, record["question"]):
+                continue
+            if self._matches(record, focus_area, source):
+                self.near_hits += 1
+                return record, "near", similarity
+        return None
+
+    def stats(self) -> dict:
+        hits = self.exact_hits + self.near_hits
+        return {
+            "entries": len(self.records),
+            "lookups": self.lookups,
+            "exact_hits": self.exact_hits,
+            "near_hits": self.near_hits,
+            "hit_rate": hits / self.lookups if self.lookups else 0.0,
+        }
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: str) -> "AnswerIndex":
+        with open(path, "rb") as f:
+            index = pickle.load(f)
+        index.reset_stats()
+        return index
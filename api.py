@@ -1,35 +1,214 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from sentence_transformers import SentenceTransformer
-from langchain_google_genai import ChatGoogleGenerativeAI
+from contextlib import asynccontextmanager
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import TYPE_CHECKING
+from fastapi import APIRouter, FastAPI, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
 import psycopg2
 from psycopg2.extras import RealDictCursor
-import os
+from answer_index import AnswerIndex, normalize_question
+from cache import LRUCache
+from coalesce import SingleFlight
+from encoder import get_encoder
+from query_log import QueryLogger
+from rerank import CrossEncoderReranker
+
+if TYPE_CHECKING:
+    from memory_store import InMemoryStore
+
+
+logger = logging.getLogger(__name__)
 
+# Index des questions MedQuAD construit par base_embedding.py (correspondances
+# exactes et quasi-exactes servies sans encodeur ni base de données).
+ANSWER_INDEX_PATH = os.getenv("MEDICLA_ANSWER_INDEX", "answer_index.pkl")
+WARMUP = os.getenv("MEDICLA_WARMUP", "1") == "1"
+WARMUP_QUESTIONS = [
+    "What is (are) Glaucoma ?",
+    "What are the symptoms of Diabetes ?",
+    "How to prevent High Blood Pressure ?",
+    "What are the treatments for Asthma ?",
+]
+# Questions fréquentes calculées hors ligne par hot_questions.py à partir du
+# journal des requêtes ; précalculées au démarrage.
+HOT_QUESTIONS_PATH = os.getenv("MEDICLA_HOT_QUESTIONS", "hot_questions.json")
+EMBEDDING_CACHE_SIZE = int(os.getenv("MEDICLA_EMBEDDING_CACHE_SIZE", "4096"))
+ANSWER_CACHE_SIZE = int(os.getenv("MEDICLA_ANSWER_CACHE_SIZE", "1024"))
+# Seuils de distance cosinus (embedding <=> question) pour la classification de
+# confiance : les appels Gemini / TTS du client sont sautés en confiance "low".
+HIGH_CONFIDENCE_DISTANCE = float(os.getenv("MEDICLA_HIGH_CONFIDENCE_DISTANCE", "0.35"))
+LOW_CONFIDENCE_DISTANCE = float(os.getenv("MEDICLA_LOW_CONFIDENCE_DISTANCE", "0.55"))
+HNSW_EF_SEARCH = os.getenv("MEDICLA_HNSW_EF_SEARCH")
+# Re-classement optionnel par cross-encoder (paramètre rerank des requêtes).
+RERANK_TOP_N = int(os.getenv("MEDICLA_RERANK_TOP_N", "20"))
+RERANK_PRELOAD = os.getenv("MEDICLA_RERANK_PRELOAD", "0") == "1"
+# Recherche dans qa_table (Postgres + pgvector) ou dans le store numpy écrit par
+# base_embedding.py / benchmarks.bench_suite (aucune base de données requise).
+RETRIEVAL_BACKEND = os.getenv("MEDICLA_RETRIEVAL_BACKEND", "postgres")
+MEMORY_STORE_PATH = os.getenv("MEDICLA_MEMORY_STORE", "memory_store")
+RETRIEVAL_BACKENDS = ("postgres", "memory")
 
-hf_model = SentenceTransformer("sentence-transformers/all-mpnet-base-v2")
+# Chargés dans le lifespan (ou avant le fork, cf. serve.py) et non à l'import.
+hf_model = None
+answer_index = AnswerIndex()
+memory_store: "InMemoryStore | None" = None
+ready = False
+load_error: str | None = None
+
+# Les requêtes concurrentes identiques partagent un seul encodage + recherche.
+coalescer = SingleFlight()
+embedding_cache = LRUCache(EMBEDDING_CACHE_SIZE)
+answer_cache = LRUCache(ANSWER_CACHE_SIZE)
+query_logger = QueryLogger()
+reranker = CrossEncoderReranker()
 
 
 DB_CONFIG = {
     "dbname": "gen_ai_db",
     "user": "students",
-    "password": "", 
+    "password": "",
     "host": "localhost",
     "port": "5432"
 }
 
-app = APIRouter()
+
+def load_resources(warmup: bool = WARMUP) -> None:
+    """
+    Charge l'encodeur, l'index de réponses et, avec le backend "memory", le
+    store d'embeddings puis, si demandé, fait passer un lot de questions dans le
+    modèle pour que la première vraie requête soit chaude.
+    """
+    global hf_model, answer_index, memory_store, ready
+    if ready:
+        return
+    if RETRIEVAL_BACKEND not in RETRIEVAL_BACKENDS:
+        raise ValueError(f"Backend de recherche '{RETRIEVAL_BACKEND}' inconnu. "
+                         f"Choisissez parmi : {', '.join(RETRIEVAL_BACKENDS)}.")
+
+    start = time.perf_counter()
+    hf_model = get_encoder()
+    if os.path.exists(ANSWER_INDEX_PATH):
+        answer_index = AnswerIndex.load(ANSWER_INDEX_PATH)
+    if RETRIEVAL_BACKEND == "memory" and memory_store is None:
+        # Import différé : pandas n'est chargé qu'avec ce backend. Un store déjà
+        # fourni (benchmarks) n'est pas rechargé depuis le disque.
+        from memory_store import InMemoryStore
+
+        memory_store = InMemoryStore.load(MEMORY_STORE_PATH)
+    if RERANK_PRELOAD:
+        reranker.load()
+    if warmup:
+        hf_model.encode(WARMUP_QUESTIONS[0])
+        hf_model.encode(WARMUP_QUESTIONS)
+        prewarm_hot_questions()
+    ready = True
+    logger.info("Ressources chargées en %.2f s", time.perf_counter() - start)
+
+
+def prewarm_hot_questions(path: str = HOT_QUESTIONS_PATH) -> None:
+    """
+    Précalcule les questions fréquentes que l'index ne couvre pas :
+    embeddings encodés en un seul lot, puis réponses mises en cache. Les réponses
+    aux questions sans filtre sont aussi ajoutées à l'index, avec leur
+    distance cosinus, pour être servies sans encodeur ni recherche.
+
+    Les questions sont encodées sous leur forme brute (la plus fréquente dans le
+    journal), comme sur le chemin à froid, et non sous leur forme normalisée.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as f:
+        hot = json.load(f)[:ANSWER_CACHE_SIZE]
+    for entry in hot:
+        entry["text"] = entry.get("raw_question") or entry["question"]
+
+    hot = [entry for entry in hot
+           if not answer_index.lookup(entry["text"], entry.get("focus_area"), entry.get("source"))]
+    questions = [entry["text"] for entry in hot if normalize_question(entry["text"]) not in embedding_cache]
+    if questions:
+        for question, embedding in zip(questions, hf_model.encode(questions)):
+            embedding_cache.put(normalize_question(question), embedding.tolist())
+
+    warmed, indexed = 0, []
+    for entry in hot:
+        focus_area, source = entry.get("focus_area"), entry.get("source")
+        try:
+            response, trace = answer_question(entry["text"], focus_area, source)
+        except HTTPException as e:
+            if e.status_code == 404:
+                continue
+            logger.warning("Préchauffage des réponses interrompu : %s", e.detail)
+            break
+        answer_cache.put(coalescing_key("answer", entry["text"], focus_area, source, None, False, None), response)
+        warmed += 1
+        # Avec un filtre, la meilleure réponse de la tranche n'est pas forcément
+        # celle d'une requête sans filtre : seules les questions sans filtre sont indexées.
+        if not focus_area and not source:
+            indexed.append({
+                "id": trace["top_ids"][0],
+                "question": entry["text"],
+                "answer": response.answer,
+                "source": response.source,
+                "focus_area": response.focus_area,
+                "distance": response.similarity_score,
+            })
+    answer_index.add_records(indexed)
+    answer_index.reset_stats()
+    logger.info("%d questions fréquentes préchauffées (%d réponses en cache, %d dans l'index exact)",
+                len(hot), warmed, len(indexed))
+
+
+@asynccontextmanager
+async def lifespan(_):
+    # Chargement en arrière-plan : /health/live répond immédiatement et
+    # /health/ready passe à 200 une fois le modèle chaud.
+    async def load():
+        global load_error
+        try:
+            await run_in_threadpool(load_resources)
+        except Exception as e:
+            load_error = str(e)
+            logger.exception("Échec du chargement des ressources")
+
+    query_logger.start()
+    loading = asyncio.create_task(load())
+    yield
+    loading.cancel()
+    query_logger.close()
+
+
+def require_ready() -> None:
+    if load_error:
+        raise HTTPException(503, f"Resource loading failed: {load_error}")
+    if not ready:
+        raise HTTPException(503, "Model is warming up")
+
+
+router = APIRouter()
 
 class AnswerRequest(BaseModel):
     question: str
     temperature: float = 0.5
     lang: str = "en"
+    focus_area: str | None = None
+    source: str | None = None
+    max_distance: float | None = None
+    rerank: bool = False
+    rerank_top_n: int = Field(RERANK_TOP_N, ge=1, le=100)
 
 class AnswerResponse(BaseModel):
     answer: str
     source: str | None
     focus_area: str | None
     similarity_score: float
+    match_type: str = "vector"
+    confidence: str = "high"
+    reranked: bool = False
+    jaccard_similarity: float | None = None
 
 class SourceDocument(BaseModel):
     source: str | None
@@ -37,76 +216,344 @@ class SourceDocument(BaseModel):
     similarity_score: float
     similarity_type: str
     content: str | None
+    confidence: str = "high"
+    rerank_score: float | None = None
+
+class FocusAreaFacet(BaseModel):
+    focus_area: str
+    count: int
 
 def get_db_connection():
-    return psycopg2.connect(**DB_CONFIG, cursor_factory=RealDictCursor)
+    conn = psycopg2.connect(**DB_CONFIG, cursor_factory=RealDictCursor)
+    if HNSW_EF_SEARCH:
+        with conn.cursor() as cur:
+            cur.execute("SET hnsw.ef_search = %s", (int(HNSW_EF_SEARCH),))
+    return conn
+
+def classify_confidence(distance: float) -> str:
+    """Classe une distance cosinus en confiance "high", "medium" ou "low"."""
+    if distance <= HIGH_CONFIDENCE_DISTANCE:
+        return "high"
+    if distance <= LOW_CONFIDENCE_DISTANCE:
+        return "medium"
+    return "low"
 
 def embedding_to_str(embedding: list[float]) -> str:
     """Convertit une liste de floats en littéral de vecteur compatible PGVector."""
     return "[" + ", ".join(map(str, embedding)) + "]"
 
-@app.post("/answer_from_table", response_model=AnswerResponse)
-async def get_answer(request: AnswerRequest):
-    query_embedding = hf_model.encode(request.question).tolist()
+def build_filter_clause(focus_area: str | None = None, source: str | None = None) -> tuple[str, list]:
+    """
+    Construit la clause WHERE des filtres de métadonnées.
+
+    Les filtres sont poussés dans le SQL afin que Postgres n'ordonne que la
+    tranche concernée (index B-tree sur focus_area / source, cf. base_embedding.py).
+    Le seuil max_distance n'en fait pas partie : search_qa_table l'applique sur la
+    distance déjà calculée, dans une requête englobante.
+    """
+    conditions = []
+    params = []
+    if focus_area:
+        conditions.append("focus_area = %s")
+        params.append(focus_area)
+    if source:
+        conditions.append("source = %s")
+        params.append(source)
+    if not conditions:
+        return "", params
+    return "WHERE " + " AND ".join(conditions), params
+
+def coalescing_key(endpoint: str, question: str, focus_area: str | None, source: str | None,
+                   *options) -> tuple:
+    """Clé des requêtes identiques : temperature et lang n'influencent pas la recherche."""
+    return endpoint, normalize_question(question), focus_area or None, source or None, *options
+
+def encode_question(question: str) -> list[float]:
+    """Embedding de la question, mis en cache par question normalisée."""
+    key = normalize_question(question)
+    embedding = embedding_cache.get(key)
+    if embedding is None:
+        embedding = hf_model.encode(question).tolist()
+        embedding_cache.put(key, embedding)
+    return embedding
+
+def log_query(endpoint: str, question: str, focus_area: str | None, source: str | None,
+              start: float, match_type: str, trace: dict | None = None) -> None:
+    """Ajoute la requête au journal asynchrone (question normalisée et brute, latences, meilleurs ids)."""
+    trace = trace or {}
+    query_logger.log({
+        "endpoint": endpoint,
+        "question": normalize_question(question),
+        "raw_question": question,
+        "focus_area": focus_area or None,
+        "source": source or None,
+        "match_type": match_type,
+        "latency_ms": {
+            "encode": trace.get("encode_ms"),
+            "search": trace.get("search_ms"),
+            "rerank": trace.get("rerank_ms"),
+            "total": (time.perf_counter() - start) * 1000,
+        },
+        "top_ids": trace.get("top_ids", []),
+        "top_scores": trace.get("top_scores", []),
+    })
+
+def search_qa_table(query_embedding: list[float], limit: int, focus_area: str | None = None,
+                    source: str | None = None, max_distance: float | None = None) -> list[dict]:
+    """
+    Les limit lignes de qa_table les plus proches de l'embedding, par distance
+    cosinus croissante (colonne "similarity"), avec le backend configuré.
+    """
+    if RETRIEVAL_BACKEND == "memory":
+        if memory_store is None:
+            raise HTTPException(503, "Memory store not loaded")
+        return memory_store.search(query_embedding, limit, focus_area, source, max_distance)
+
     query_embedding_str = embedding_to_str(query_embedding)
-    
-    conn = None
-    try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        cur.execute("""
+    where_clause, filter_params = build_filter_clause(focus_area, source)
+
+    # Avec un focus_area, la tranche (quelques dizaines de lignes, index B-tree)
+    # est matérialisée avant le tri : la recherche y est exacte. Sans cela, le
+    # planificateur peut parcourir l'index HNSW partiel de la source et écarter
+    # après coup les lignes d'un autre focus_area parmi ses ~ef_search candidats,
+    # jusqu'à ne rien renvoyer (faux 404) alors que des lignes correspondent.
+    if focus_area:
+        query = f"""
+            WITH candidates AS MATERIALIZED (
+                SELECT id, answer, source, focus_area, content, embedding
+                FROM qa_table
+                {where_clause}
+            )
+            SELECT id, answer, source, focus_area, content,
+                   embedding <=> %s::vector(768) AS similarity
+            FROM candidates
+            ORDER BY similarity
+            LIMIT %s
+        """
+        params = (*filter_params, query_embedding_str, limit)
+    else:
+        query = f"""
             SELECT id, answer, source, focus_area, content,
                    embedding <=> %s::vector(768) AS similarity
             FROM qa_table
+            {where_clause}
             ORDER BY similarity
-            LIMIT 1
-        """, (query_embedding_str,))
-        
-        result = cur.fetchone()
-        if result:
-            return AnswerResponse(
-                answer=result["answer"],
-                source=result["source"],
-                focus_area=result["focus_area"],
-                similarity_score=float(result["similarity"])
-            )
-        
-        raise HTTPException(404, "No matching answer found")
-        
+            LIMIT %s
+        """
+        params = (query_embedding_str, *filter_params, limit)
+
+    # Le seuil porte sur la colonne similarity déjà calculée : l'ORDER BY ...
+    # LIMIT interne reste un parcours d'index HNSW (table entière ou partiel par
+    # source) qui s'arrête après limit lignes, et <=> n'est évalué qu'une fois.
+    # Les lignes étant triées, garder celles sous le seuil parmi les limit plus
+    # proches revient à prendre les limit plus proches sous le seuil.
+    if max_distance is not None:
+        query = f"SELECT * FROM ({query}) AS nearest WHERE similarity < %s ORDER BY similarity"
+        params = (*params, max_distance)
+
+    conn = None
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor()
+        cur.execute(query, params)
+        return cur.fetchall()
+
     except Exception as e:
         raise HTTPException(500, f"Database error: {str(e)}")
     finally:
         if conn:
             conn.close()
 
-@app.get("/get_sources", response_model=list[SourceDocument])
-async def get_sources(question: str, temperature: float = 0.5, lang: str = "en"):
-    query_embedding = hf_model.encode(question).tolist()
-    query_embedding_str = embedding_to_str(query_embedding)
-    
+def answer_question(question: str, focus_area: str | None, source: str | None,
+                    max_distance: float | None = None, rerank: bool = False,
+                    rerank_top_n: int = RERANK_TOP_N) -> tuple[AnswerResponse, dict]:
+    start = time.perf_counter()
+    query_embedding = encode_question(question)
+    encoded = time.perf_counter()
+    rows = search_qa_table(query_embedding, rerank_top_n if rerank else 1, focus_area, source, max_distance)
+
+    if not rows:
+        raise HTTPException(404, "No matching answer found")
+
+    searched = time.perf_counter()
+    reranked = False
+    if rerank:
+        rows, reranked = reranker.rerank(question, rows)
+    result = rows[0]
+
+    trace = {
+        "encode_ms": (encoded - start) * 1000,
+        "search_ms": (searched - encoded) * 1000,
+        "rerank_ms": (time.perf_counter() - searched) * 1000 if rerank else None,
+        "top_ids": [row["id"] for row in rows],
+        "top_scores": [float(row["similarity"]) for row in rows],
+    }
+    return AnswerResponse(
+        answer=result["answer"],
+        source=result["source"],
+        focus_area=result["focus_area"],
+        similarity_score=float(result["similarity"]),
+        confidence=classify_confidence(float(result["similarity"])),
+        reranked=reranked
+    ), trace
+
+@router.post("/answer_from_table", response_model=AnswerResponse)
+async def get_answer(request: AnswerRequest):
+    require_ready()
+    start = time.perf_counter()
+    # Correspondances exactes et quasi-doublons (mêmes mots à des mots vides
+    # près, donc la même question) sont servis par l'index. La distance et la
+    # confiance sont celles de la ligne trouvée : 0.0 pour une question de
+    # MedQuAD, distance de la recherche vectorielle pour une question fréquente
+    # préchauffée ; l'estimation MinHash de Jaccard a son propre champ. Les
+    # requêtes avec max_distance (seuil appliqué dans la recherche) ou rerank
+    # (ordre du cross-encoder) passent par la recherche vectorielle.
+    match = None
+    if request.max_distance is None and not request.rerank:
+        match = answer_index.lookup(request.question, request.focus_area, request.source)
+    if match:
+        record, match_type, jaccard = match
+        distance = record.get("distance", 0.0)
+        log_query("answer", request.question, request.focus_area, request.source, start, match_type,
+                  {"top_ids": [record["id"]], "top_scores": [distance]})
+        return AnswerResponse(
+            answer=record["answer"],
+            source=record["source"],
+            focus_area=record["focus_area"],
+            similarity_score=distance,
+            match_type=match_type,
+            confidence=classify_confidence(distance),
+            jaccard_similarity=jaccard
+        )
+
+    options = (request.max_distance, request.rerank, request.rerank_top_n if request.rerank else None)
+    key = coalescing_key("answer", request.question, request.focus_area, request.source, *options)
+    cached = answer_cache.get(key)
+    if cached is not None:
+        log_query("answer", request.question, request.focus_area, request.source, start, "cached")
+        return cached
+
+    response, trace = await coalescer.do(key, answer_question, request.question, request.focus_area,
+                                         request.source, request.max_distance, request.rerank, request.rerank_top_n)
+    # Budget de re-classement dépassé : la réponse dans l'ordre du bi-encodeur n'est
+    # pas mise en cache, la prochaine requête profitera des scores calculés entre-temps.
+    if response.reranked or not request.rerank:
+        answer_cache.put(key, response)
+    log_query("answer", request.question, request.focus_area, request.source, start, response.match_type, trace)
+    return response
+
+def retrieve_sources(question: str, focus_area: str | None, source: str | None,
+                     max_distance: float | None = None, rerank: bool = False,
+                     rerank_top_n: int = RERANK_TOP_N) -> tuple[list[dict], dict]:
+    start = time.perf_counter()
+    query_embedding = encode_question(question)
+    encoded = time.perf_counter()
+    rows = search_qa_table(query_embedding, max(rerank_top_n, 3) if rerank else 3, focus_area, source, max_distance)
+
+    searched = time.perf_counter()
+    reranked = False
+    if rerank:
+        rows, reranked = reranker.rerank(question, rows)
+    rows = rows[:3]
+
+    trace = {
+        "encode_ms": (encoded - start) * 1000,
+        "search_ms": (searched - encoded) * 1000,
+        "rerank_ms": (time.perf_counter() - searched) * 1000 if rerank else None,
+        "top_ids": [row["id"] for row in rows],
+        "top_scores": [float(row["similarity"]) for row in rows],
+    }
+    return [{
+        "source": row["source"],
+        "focus_area": row["focus_area"],
+        "similarity_score": float(row["similarity"]),
+        "similarity_type": "cosine",
+        "content": row["content"],
+        "confidence": classify_confidence(float(row["similarity"])),
+        "rerank_score": row.get("rerank_score") if reranked else None
+    } for row in rows], trace
+
+@router.get("/get_sources", response_model=list[SourceDocument])
+async def get_sources(question: str, temperature: float = 0.5, lang: str = "en",
+                      focus_area: str | None = None, source: str | None = None,
+                      max_distance: float | None = None, rerank: bool = False,
+                      rerank_top_n: int = Query(RERANK_TOP_N, ge=1, le=100)):
+    require_ready()
+    start = time.perf_counter()
+    key = coalescing_key("sources", question, focus_area, source, max_distance, rerank, rerank_top_n if rerank else None)
+    sources, trace = await coalescer.do(key, retrieve_sources, question, focus_area, source,
+                                        max_distance, rerank, rerank_top_n)
+    log_query("sources", question, focus_area, source, start, "vector", trace)
+    return sources
+
+@router.get("/focus_areas", response_model=list[FocusAreaFacet])
+async def get_focus_areas(source: str | None = None, limit: int = Query(100, ge=1, le=1000)):
+    """Liste les focus_area disponibles avec leur nombre de documents (facettes)."""
+    if RETRIEVAL_BACKEND == "memory":
+        if memory_store is None:
+            raise HTTPException(503, "Memory store not loaded")
+        return memory_store.focus_areas(source, limit)
+
+    where_clause, filter_params = build_filter_clause(source=source)
+    # Lignes sans focus_area exclues avant le LIMIT : elles n'occupent pas de place.
+    where_clause = (where_clause + " AND " if where_clause else "WHERE ") + "focus_area <> ''"
+
     conn = None
     try:
         conn = get_db_connection()
         cur = conn.cursor()
-        cur.execute("""
-            SELECT source, focus_area, content,
-                   embedding <=> %s::vector(768) AS similarity
+        cur.execute(f"""
+            SELECT focus_area, COUNT(*) AS count
             FROM qa_table
-            ORDER BY similarity
-            LIMIT 3
-        """, (query_embedding_str,))
-        
+            {where_clause}
+            GROUP BY focus_area
+            ORDER BY count DESC, focus_area
+            LIMIT %s
+        """, (*filter_params, limit))
+
         return [{
-            "source": row["source"],
             "focus_area": row["focus_area"],
-            "similarity_score": float(row["similarity"]),
-            "similarity_type": "cosine",
-            "content": row["content"]
+            "count": int(row["count"])
         } for row in cur.fetchall()]
-        
+
     except Exception as e:
         raise HTTPException(500, f"Database error: {str(e)}")
     finally:
         if conn:
-            conn.close()
\ No newline at end of file
+            conn.close()
+
+@router.get("/answer_index/stats")
+async def get_answer_index_stats():
+    """Taux de réponses servies par l'index exact / quasi-exact."""
+    return answer_index.stats()
+
+@router.get("/health/live")
+async def liveness():
+    """Le processus répond (sonde de vivacité)."""
+    return {"status": "alive"}
+
+@router.get("/health/ready")
+async def readiness():
+    """Le modèle est chargé et chaud : le worker peut recevoir du trafic."""
+    require_ready()
+    return {"status": "ready"}
+
+@router.get("/coalescing/stats")
+async def get_coalescing_stats():
+    """Nombre de requêtes servies par un calcul déjà en cours."""
+    return coalescer.stats()
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """Caches d'embeddings et de réponses, et état du journal des requêtes."""
+    return {
+        "embeddings": embedding_cache.stats(),
+        "answers": answer_cache.stats(),
+        "query_log": query_logger.stats(),
+        "rerank": reranker.stats(),
+    }
+
+# Application servie par uvicorn / serve.py : contrairement à un APIRouter nu,
+# FastAPI convertit les HTTPException (503, 404...) en réponses HTTP.
+app = FastAPI(lifespan=lifespan)
+app.include_router(router)
@@ -2,6 +2,14 @@ import streamlit as st
 import time
 import requests
 import os
+import hashlib
+import mimetypes
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from requests.adapters import HTTPAdapter
 from PIL import Image, ImageDraw, ImageOps
 from typing import List, Dict
 from dotenv import load_dotenv
@@ -14,6 +22,11 @@ load_dotenv()
 
 HOST = "http://localhost:8181"
 
+LOW_CONFIDENCE_MESSAGE = (
+    "⚠️ Aucune réponse suffisamment proche de votre question n'a été trouvée dans la base. "
+    "Reformulez votre question ou consultez un professionnel de santé."
+)
+
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 if GEMINI_API_KEY:
@@ -56,6 +69,179 @@ def generate_refined_response(query, original_response, language="en"):
         return f"Erreur lors de la génération de la réponse raffinée: {str(e)}"
 
 
+# Ressources partagées et caches
+
+class ArtifactCache:
+    """
+    Cache LRU thread-safe des artefacts coûteux (vidéos, réponses raffinées), indexé par contenu.
+
+    Les créations concurrentes d'une même clé sont fusionnées : une seule session
+    génère l'artefact, les autres attendent puis le lisent dans le cache.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        return None
+
+    def get_or_create(self, key, create, cacheable=lambda value: value is not None):
+        while True:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    return self._entries[key]
+                pending = self._pending.get(key)
+                if pending is None:
+                    pending = self._pending[key] = threading.Event()
+                    break
+            # Création en cours dans une autre session : en cas d'échec (valeur
+            # non mise en cache), l'une des sessions en attente retente.
+            pending.wait()
+
+        try:
+            value = create()
+            if cacheable(value):
+                with self._lock:
+                    self._entries[key] = value
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+        finally:
+            with self._lock:
+                del self._pending[key]
+            pending.set()
+        return value
+
+
+@st.cache_resource
+def get_http_session():
+    """Session HTTP partagée : les connexions vers l'API sont réutilisées."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@st.cache_resource
+def get_executor():
+    return ThreadPoolExecutor(max_workers=8, thread_name_prefix="medicla")
+
+
+@st.cache_resource
+def get_artifact_cache():
+    """Cache global, partagé par toutes les sessions Streamlit."""
+    return ArtifactCache()
+
+
+def content_key(*parts):
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def cached_refined_response(query, original_response, language="en"):
+    return get_artifact_cache().get_or_create(
+        ("refined", content_key(query, original_response, language)),
+        lambda: generate_refined_response(query, original_response, language=language),
+        cacheable=lambda text: not text.startswith("Erreur"),
+    )
+
+
+def video_cache_key(text, language, mode="video"):
+    return "video", content_key(text, language, mode)
+
+
+def cached_video(text, language, mode="video", on_first_sentence=None):
+    """
+    Réponse audiovisuelle (octets, type MIME) ; générée une seule fois par contenu,
+    langue et mode ("video" : image fixe + audio, "audio" : audio seul).
+    on_first_sentence n'est appelé que si le rendu a lieu ici (voir generate_audio).
+    """
+    def render():
+        # Répertoire propre à chaque rendu : deux sessions ne partagent jamais
+        # leurs fichiers intermédiaires (audio, vidéo).
+        workdir = tempfile.mkdtemp(prefix="medicla_video_")
+        try:
+            media_path = generate_video(text, language=language,
+                                        output_file=os.path.join(workdir, "response_video.mp4"), mode=mode,
+                                        on_first_sentence=on_first_sentence)
+            if not media_path:
+                return None
+            with open(media_path, "rb") as f:
+                media = f.read()
+            return media, mimetypes.guess_type(media_path)[0]
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return get_artifact_cache().get_or_create(video_cache_key(text, language, mode), render)
+
+
+def session_video(text, language, mode="video"):
+    """
+    Vidéo servie depuis le cache global (LRU borné) : un simple rerun ne régénère
+    rien et la session ne conserve aucun octet de média.
+    """
+    video = get_artifact_cache().get(video_cache_key(text, language, mode))
+    if video is None:
+        with st.spinner("Generating audiovisual response... 🎥"):
+            video = cached_video(text, language, mode)
+    return video
+
+
+def show_media(media):
+    data, mime = media
+    if mime and mime.startswith("audio/"):
+        st.audio(data, format=mime)
+    else:
+        st.video(data)
+
+
+def first_sentence_audio():
+    """
+    Future de l'audio (octets, type MIME) de la première phrase et le rappel à
+    passer à cached_video pour la remplir depuis le thread de rendu.
+    """
+    future = Future()
+
+    def on_first_sentence(path):
+        with open(path, "rb") as f:
+            future.set_result((f.read(), mimetypes.guess_type(path)[0]))
+
+    return future, on_first_sentence
+
+
+def refine_with_video(query, original_response, language, audio_language, mode="video"):
+    refined = cached_refined_response(query, original_response, language=language)
+    return refined, cached_video(refined, audio_language, mode)
+
+
+@st.cache_data
+def load_circular_image(path, mtime):
+    img = Image.open(path).convert("RGBA")
+
+    w, h = img.size
+    min_dim = min(w, h)
+    left = (w - min_dim) // 2
+    top = (h - min_dim) // 2
+    right = left + min_dim
+    bottom = top + min_dim
+    img_cropped = img.crop((left, top, right, bottom))
+
+    mask = Image.new("L", (min_dim, min_dim), 0)
+    draw = ImageDraw.Draw(mask)
+    draw.ellipse((0, 0, min_dim, min_dim), fill=255)
+
+    img_circular = ImageOps.fit(img_cropped, (min_dim, min_dim))
+    img_circular.putalpha(mask)
+    return img_circular
+
+
 # Page d'accueil
 
 def create_homepage():
@@ -151,23 +337,9 @@ def create_homepage():
     """, unsafe_allow_html=True)
     
     
-    img = Image.open("Flux_Dev_A_beautifully_poised_Latin_woman_embodying_the_essenc_1.jpeg").convert("RGBA")
-    #img = Image.open("flux.jpeg").convert("RGBA")
-
-    w, h = img.size
-    min_dim = min(w, h)
-    left = (w - min_dim) // 2
-    top = (h - min_dim) // 2
-    right = left + min_dim
-    bottom = top + min_dim
-    img_cropped = img.crop((left, top, right, bottom))
-
-    mask = Image.new("L", (min_dim, min_dim), 0)
-    draw = ImageDraw.Draw(mask)
-    draw.ellipse((0, 0, min_dim, min_dim), fill=255)
-
-    img_circular = ImageOps.fit(img_cropped, (min_dim, min_dim))
-    img_circular.putalpha(mask)
+    image_path = "Flux_Dev_A_beautifully_poised_Latin_woman_embodying_the_essenc_1.jpeg"
+    #image_path = "flux.jpeg"
+    img_circular = load_circular_image(image_path, os.path.getmtime(image_path))
 
     st.image(img_circular, width=250)
    
@@ -262,6 +434,12 @@ def chatbot_interface():
             "Audio language for the response:",
             options={"fr": "French", "en": "English", "ar": "Arabic", "es": "Spanish"}
         )
+        media_mode = st.radio(
+            "Audiovisual response format:",
+            options=["video", "audio"],
+            format_func={"video": "Video (image + audio)", "audio": "Audio only (faster)"}.get,
+            horizontal=True
+        )
     
 
     for tab_name in ["standard_messages", "refined_messages"]:
@@ -286,11 +464,11 @@ def chatbot_interface():
                     st.write("Content:")
                     st.write(doc.get("content", ""))
 
-            if len(st.session_state.standard_messages) > 1 and st.session_state.standard_messages[-1]["role"] == "assistant":
-                st.write("Generating audiovisual response... 🎥")
-                video_path = generate_video(st.session_state.standard_messages[-1]["content"], language=audio_language)
-                if video_path:
-                    st.video(video_path)
+            last_message = st.session_state.standard_messages[-1]
+            if len(st.session_state.standard_messages) > 1 and last_message["role"] == "assistant" and last_message.get("confidence") != "low":
+                video = session_video(st.session_state.standard_messages[-1]["content"], audio_language, media_mode)
+                if video:
+                    show_media(video)
                 else:
                     st.error("Failed to generate the video.")
             
@@ -299,11 +477,11 @@ def chatbot_interface():
             avatar = "🧞‍♂️" if message["role"] == "assistant" else "🧑‍⚕️"
             st.chat_message(message["role"], avatar=avatar).write(message["content"])
             
-        if len(st.session_state.refined_messages) > 1 and st.session_state.refined_messages[-1]["role"] == "assistant":
-            st.write("Generating audiovisual response... 🎥")
-            video_path = generate_video(st.session_state.refined_messages[-1]["content"], language=audio_language)
-            if video_path:
-                st.video(video_path)
+        last_message = st.session_state.refined_messages[-1]
+        if len(st.session_state.refined_messages) > 1 and last_message["role"] == "assistant" and last_message.get("confidence") != "low":
+            video = session_video(st.session_state.refined_messages[-1]["content"], audio_language, media_mode)
+            if video:
+                show_media(video)
             else:
                 st.error("Failed to generate the video.")
     
@@ -311,7 +489,12 @@ def chatbot_interface():
         st.session_state.standard_messages.append({"role": "user", "content": question})
         st.session_state.refined_messages.append({"role": "user", "content": question})
         
-        response = requests.post(
+        session = get_http_session()
+        executor = get_executor()
+
+        # Réponse et sources sont indépendantes : les deux appels partent en parallèle.
+        response_future = executor.submit(
+            session.post,
             f"{HOST}/answer_from_table",
             json={
                 "question": question,
@@ -321,7 +504,8 @@ def chatbot_interface():
             timeout=20
         )
         
-        sources_response = requests.get(
+        sources_future = executor.submit(
+            session.get,
             f"{HOST}/get_sources",
             params={
                 "question": question,
@@ -331,13 +515,36 @@ def chatbot_interface():
             timeout=20
         )
         
+        response = response_future.result()
         if response.status_code == 200:
             standard_answer = response.json().get("answer", "No answer provided.")
+            confidence = response.json().get("confidence", "high")
             
-            st.session_state.standard_messages.append({"role": "assistant", "content": standard_answer})
+            st.session_state.standard_messages.append({"role": "assistant", "content": standard_answer, "confidence": confidence})
             
-            refined_answer = generate_refined_response(question, standard_answer, language=language)
-            st.session_state.refined_messages.append({"role": "assistant", "content": refined_answer})
+            if confidence == "low":
+                # Correspondance trop éloignée : inutile de payer Gemini et deux vidéos
+                # pour raffiner une réponse hors sujet.
+                refined_answer = LOW_CONFIDENCE_MESSAGE
+                sources_response = sources_future.result()
+            else:
+                # La vidéo standard et la chaîne Gemini -> vidéo raffinée tournent en parallèle.
+                # La lecture de la première phrase démarre dès sa synthèse, pendant
+                # que le reste de l'audio (et la vidéo) est encore en cours.
+                first_audio, on_first_sentence = first_sentence_audio()
+                standard_video_future = executor.submit(cached_video, standard_answer, audio_language, media_mode,
+                                                        on_first_sentence)
+                refined_future = executor.submit(refine_with_video, question, standard_answer, language, audio_language, media_mode)
+                wait([first_audio, standard_video_future], return_when=FIRST_COMPLETED)
+                if first_audio.done() and not standard_video_future.done():
+                    st.chat_message("assistant", avatar="🧞‍♂️").write(standard_answer)
+                    show_media(first_audio.result())
+                with st.spinner("Generating responses... 🎥"):
+                    refined_answer, _ = refined_future.result()
+                    standard_video_future.result()
+                    sources_response = sources_future.result()
+
+            st.session_state.refined_messages.append({"role": "assistant", "content": refined_answer, "confidence": confidence})
             
             if sources_response.status_code == 200:
                 st.session_state.sources = sources_response.json()
@@ -1,44 +1,188 @@
 from gtts import gTTS
-import sys
-sys.path.append(r"C:\Users\khali\OneDrive\Bureau\gen ia\GenAI-GCP\exercices\tp_4\tp4\Lib\site-packages")
-from moviepy.editor import *
+from concurrent.futures import ThreadPoolExecutor
+import imageio_ffmpeg
 import os
 import re
+import shutil
+import subprocess
+import tempfile
+import wave
+
+
+SUPPORTED_LANGUAGES = ['fr', 'en', 'ar', 'es']
+TTS_PROVIDER = os.getenv("MEDICLA_TTS_PROVIDER", "gtts")
+TTS_WORKERS = int(os.getenv("MEDICLA_TTS_WORKERS", "4"))
 
 
 def clean_text(text):
-    
+
     cleaned_text = re.sub(r'[^\w\s.,?!]', '', text)
     return cleaned_text
 
-def generate_video(response_text, language="fr", output_file="response_video.mp4"):
+def split_sentences(text, max_chars=200):
     """
-    Génère une vidéo avec audio à partir du texte fourni dans plusieurs langues.
-    :param response_text: Texte à convertir en audio/vidéo.
-    :param language: Langue pour la synthèse vocale (fr, en, ar, ru, es).
-    :param output_file: Nom du fichier vidéo généré.
-    :return: Chemin du fichier vidéo.
+    Découpe un texte en phrases pour la synthèse vocale.
+    Les phrases trop longues sont recoupées sur les virgules puis sur les mots.
     """
-    try:
-        response_text = clean_text(response_text)
-        supported_languages = ['fr', 'en', 'ar', 'es']
-        if language not in supported_languages:
-            raise ValueError(f"Langue '{language}' non supportée. Choisissez parmi : {', '.join(supported_languages)}.")
+    sentences = []
+    for sentence in re.split(r'(?<=[.!?])\s+', text.strip()):
+        sentence = sentence.strip()
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(',', 0, max_chars)
+            if cut <= 0:
+                cut = sentence.rfind(' ', 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            sentences.append(sentence[:cut + 1].strip())
+            sentence = sentence[cut + 1:].strip()
+        if sentence:
+            sentences.append(sentence)
+    return sentences
+
+
+class GTTSProvider:
+    """Synthèse vocale Google Translate (gTTS), nécessite un accès réseau."""
+    extension = "mp3"
 
-        tts = gTTS(response_text, lang=language)
-        audio_file = "response_audio.mp3"
-        tts.save(audio_file)
-        
-        video_clip = ImageClip("heart.jpg", duration=10)
-        audio_clip = AudioFileClip(audio_file)
-        video_clip = video_clip.set_audio(audio_clip)
+    def synthesize(self, text, language, path):
+        gTTS(text, lang=language).save(path)
 
-        video_clip.write_videofile(output_file, fps=24)
 
-        os.remove(audio_file)
+class SilentStubProvider:
+    """Fournisseur hors ligne : un silence WAV dont la durée suit la longueur du texte."""
+    extension = "wav"
+    sample_rate = 16000
+
+    def synthesize(self, text, language, path):
+        duration = max(0.5, 0.35 * len(text.split()))
+        with wave.open(path, "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(self.sample_rate)
+            f.writeframes(b"\x00\x00" * int(duration * self.sample_rate))
+
+
+TTS_PROVIDERS = {
+    "gtts": GTTSProvider,
+    "stub": SilentStubProvider,
+}
+
+def get_tts_provider(name=None):
+    """Retourne le fournisseur de synthèse vocale (MEDICLA_TTS_PROVIDER par défaut)."""
+    name = name or TTS_PROVIDER
+    if name not in TTS_PROVIDERS:
+        raise ValueError(f"Fournisseur TTS '{name}' inconnu. Choisissez parmi : {', '.join(TTS_PROVIDERS)}.")
+    return TTS_PROVIDERS[name]()
+
+def stream_speech(response_text, workdir, language="fr", provider=None):
+    """
+    Synthétise le texte phrase par phrase, en parallèle, et renvoie les fichiers
+    audio dans l'ordre du texte au fur et à mesure qu'ils sont prêts.
+    :param response_text: Texte à convertir en audio.
+    :param workdir: Dossier des fichiers audio par phrase, fourni et nettoyé par l'appelant.
+    :param language: Langue pour la synthèse vocale (fr, en, ar, es).
+    :param provider: Fournisseur TTS (voir get_tts_provider).
+    :return: Générateur de chemins de fichiers audio, un par phrase.
+    """
+    if language not in SUPPORTED_LANGUAGES:
+        raise ValueError(f"Langue '{language}' non supportée. Choisissez parmi : {', '.join(SUPPORTED_LANGUAGES)}.")
+    provider = provider or get_tts_provider()
+    sentences = split_sentences(clean_text(response_text))
+
+    with ThreadPoolExecutor(max_workers=TTS_WORKERS) as executor:
+        futures = []
+        for i, sentence in enumerate(sentences):
+            path = os.path.join(workdir, f"sentence_{i:04d}.{provider.extension}")
+            futures.append(executor.submit(lambda s=sentence, p=path: provider.synthesize(s, language, p) or p))
+        for future in futures:
+            yield future.result()
 
-        return output_file
+def concat_audio(paths, output_file):
+    """Concatène les fichiers audio des phrases (MP3 bout à bout, WAV via le module wave)."""
+    if output_file.endswith(".wav"):
+        with wave.open(output_file, "wb") as out:
+            for i, path in enumerate(paths):
+                with wave.open(path, "rb") as part:
+                    if i == 0:
+                        out.setparams(part.getparams())
+                    out.writeframes(part.readframes(part.getnframes()))
+    else:
+        with open(output_file, "wb") as out:
+            for path in paths:
+                with open(path, "rb") as part:
+                    shutil.copyfileobj(part, out)
+    return output_file
+
+def generate_audio(response_text, language="fr", output_file="response_audio.mp3", provider=None,
+                   on_first_sentence=None):
+    """
+    Génère uniquement l'audio de la réponse (mode le plus rapide, sans vidéo).
+    L'extension de output_file est ajustée au format du fournisseur TTS.
+    :param on_first_sentence: Appelé avec le fichier audio de la première phrase dès
+        qu'il est prêt, pour démarrer la lecture avant la fin de la synthèse. Le
+        fichier est supprimé ensuite : l'appelant doit le lire pendant l'appel.
+    :return: Chemin du fichier audio.
+    """
+    provider = provider or get_tts_provider()
+    output_file = os.path.splitext(output_file)[0] + "." + provider.extension
+    workdir = tempfile.mkdtemp(prefix="medicla_tts_")
+    try:
+        paths = []
+        for path in stream_speech(response_text, workdir, language=language, provider=provider):
+            if not paths and on_first_sentence:
+                on_first_sentence(path)
+            paths.append(path)
+        if not paths:
+            raise ValueError("Aucun texte à synthétiser.")
+        return concat_audio(paths, output_file)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def encode_static_video(image_file, audio_file, output_file):
+    """
+    Assemble une image fixe et une piste audio en MP4.
+    L'image est encodée à 1 image/s (réglage stillimage) et l'audio MP3 est copié
+    sans réencodage ; seul un WAV (fournisseur hors ligne) est converti en AAC.
+    """
+    audio_codec = ["-c:a", "copy"] if audio_file.endswith(".mp3") else ["-c:a", "aac"]
+    subprocess.run([
+        imageio_ffmpeg.get_ffmpeg_exe(), "-y", "-loglevel", "error",
+        "-loop", "1", "-framerate", "1", "-i", image_file,
+        "-i", audio_file,
+        "-c:v", "libx264", "-tune", "stillimage", "-preset", "veryfast", "-r", "1",
+        "-vf", "scale=trunc(iw/2)*2:trunc(ih/2)*2", "-pix_fmt", "yuv420p",
+        *audio_codec, "-shortest", "-movflags", "+faststart",
+        output_file,
+    ], check=True)
+    return output_file
+
+def generate_video(response_text, language="fr", output_file="response_video.mp4", mode="video", provider=None, image_file="heart.jpg",
+                   on_first_sentence=None):
+    """
+    Génère une réponse audiovisuelle à partir du texte fourni dans plusieurs langues.
+    :param response_text: Texte à convertir en audio/vidéo.
+    :param language: Langue pour la synthèse vocale (fr, en, ar, es).
+    :param output_file: Nom du fichier vidéo généré.
+    :param mode: "video" (image fixe + audio) ou "audio" (audio seul, sans encodage vidéo).
+    :param provider: Fournisseur TTS (voir get_tts_provider).
+    :param image_file: Image fixe de la vidéo.
+    :param on_first_sentence: Voir generate_audio.
+    :return: Chemin du fichier vidéo (ou audio en mode "audio").
+    """
+    try:
+        if mode == "audio":
+            return generate_audio(response_text, language=language, output_file=output_file, provider=provider,
+                                  on_first_sentence=on_first_sentence)
+        if mode != "video":
+            raise ValueError(f"Mode '{mode}' non supporté. Choisissez parmi : video, audio.")
+
+        audio_file = generate_audio(response_text, language=language,
+                                    output_file=os.path.splitext(output_file)[0] + "_audio.mp3", provider=provider,
+                                    on_first_sentence=on_first_sentence)
+        try:
+            return encode_static_video(image_file, audio_file, output_file)
+        finally:
+            os.remove(audio_file)
     except Exception as e:
         print(f"Erreur lors de la génération de la vidéo : {e}")
         return None
-
@@ -1,10 +1,13 @@
+import re
 import pandas as pd
 import torch
 from sqlalchemy import create_engine, text
-from sentence_transformers import SentenceTransformer
 import psycopg2.extras
 import numpy as np
 from tqdm import tqdm
+from answer_index import AnswerIndex
+from encoder import ENCODER_BACKEND, get_encoder
+from memory_store import InMemoryStore
 
 DB_PASS = ""
 DB_HOST = "localhost"
@@ -13,6 +16,8 @@ DATABASE = "gen_ai_db"
 DB_USER = "students"
 DB_NAME = "gen_ai_db"
 DB_PORT = "5432"
+ANSWER_INDEX_PATH = "answer_index.pkl"
+MEMORY_STORE_PATH = "memory_store"
 
 db_url = f"postgresql+psycopg2://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 engine = create_engine(db_url)
@@ -24,8 +29,7 @@ df.columns = df.columns.str.strip()
 device = "cuda" if torch.cuda.is_available() else "cpu"
 print(f"Utilisation de: {device}")
 
-model = SentenceTransformer("all-mpnet-base-v2")
-model.to(device)
+model = get_encoder(ENCODER_BACKEND, device=device if ENCODER_BACKEND == "torch" else None)
 
 contents = []
 for idx, row in df.iterrows():
@@ -41,7 +45,7 @@ all_embeddings = []
 print("Génération des embeddings en cours...")
 for i in tqdm(range(0, len(contents), BATCH_SIZE)):
     batch = contents[i:i+BATCH_SIZE]
-    batch_embeddings = model.encode(batch, show_progress_bar=False, convert_to_numpy=True)
+    batch_embeddings = model.encode(batch)
     all_embeddings.append(batch_embeddings)
 
 all_embeddings = np.vstack(all_embeddings)
@@ -101,4 +105,52 @@ with engine.begin() as conn:
     cursor.close()
     raw_conn.close()
 
-print(f"Ingestion complète : {len(records)} documents insérés dans kqa_table.")
\ No newline at end of file
+print(f"Ingestion complète : {len(records)} documents insérés dans kqa_table.")
+
+# Index de métadonnées : les filtres focus_area / source de l'API sont poussés
+# dans le SQL, ces index B-tree limitent le parcours à la tranche concernée.
+# L'index HNSW sur toute la table sert les recherches sans filtre (hnsw.ef_search
+# et l'arrêt au LIMIT s'y appliquent, au lieu d'un parcours séquentiel).
+# Chaque source MedQuAD reçoit en plus un index HNSW partiel pour les recherches
+# filtrées par source seule ; dès qu'un focus_area est donné, api.py matérialise
+# la tranche via les index B-tree et y calcule les distances exactement.
+print("Création des index...")
+with engine.begin() as conn:
+    conn.execute(text("CREATE INDEX IF NOT EXISTS qa_table_focus_area_idx ON qa_table (focus_area)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS qa_table_source_idx ON qa_table (source)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS qa_table_source_focus_area_idx ON qa_table (source, focus_area)"))
+
+    conn.execute(text("""
+        CREATE INDEX IF NOT EXISTS qa_table_embedding_idx ON qa_table
+        USING hnsw (embedding vector_cosine_ops)
+    """))
+
+    sources = [row[0] for row in conn.execute(text("SELECT DISTINCT source FROM qa_table WHERE source <> ''"))]
+    for source in sources:
+        index_name = "qa_table_embedding_" + re.sub(r"\W+", "_", source.lower()).strip("_")[:40] + "_idx"
+        conn.execute(
+            text(f"""
+                CREATE INDEX IF NOT EXISTS {index_name} ON qa_table
+                USING hnsw (embedding vector_cosine_ops)
+                WHERE source = :source
+            """).bindparams(source=source)
+        )
+    conn.execute(text("ANALYZE qa_table"))
+
+print(f"Index créés : 3 B-tree, 1 HNSW sur la table, {len(sources)} HNSW partiels par source.")
+
+# Index des questions pour le chemin rapide de l'API (correspondances exactes
+# et quasi-exactes via MinHash/LSH), construit à partir des ids en base.
+with engine.connect() as conn:
+    rows = conn.execute(text("SELECT id, question, answer, source, focus_area, content FROM qa_table ORDER BY id")).mappings().all()
+
+answer_index = AnswerIndex()
+answer_index.add_records([dict(row) for row in rows])
+answer_index.save(ANSWER_INDEX_PATH)
+print(f"Index de réponses sauvegardé dans {ANSWER_INDEX_PATH} ({len(answer_index.exact)} questions distinctes).")
+
+# Copie en mémoire de qa_table (MEDICLA_RETRIEVAL_BACKEND=memory) : les ids
+# suivent l'ordre d'insertion grâce à RESTART IDENTITY.
+memory_store = InMemoryStore.from_records([dict(row) for row in rows], all_embeddings)
+memory_store.save(MEMORY_STORE_PATH)
+print(f"Store en mémoire sauvegardé dans {MEMORY_STORE_PATH} ({memory_store.nbytes / 2**20:.1f} Mo d'embeddings).")
@@ -0,0 +1,117 @@
+"""
+Benchmark du filtrage par confiance sur med_query.csv.
+
+Interroge /answer_from_table avec un échantillon de questions MedQuAD, dont une
+part est reformulée et complétée par des questions hors sujet, puis mesure :
+- la répartition high / medium / low des réponses ;
+- les appels Gemini et rendus TTS évités par le client (1 appel Gemini et
+  2 vidéos par réponse en confiance "low") ;
+- pour une série de seuils, la part de réponses écartées et, parmi elles, la
+  part de bonnes réponses écartées à tort.
+
+    python -m benchmarks.bench_confidence --questions 200
+"""
+import argparse
+import random
+
+import numpy as np
+import pandas as pd
+import requests
+
+from benchmarks.common import MED_QUERY_CSV, write_results
+
+
+API_URL = "http://localhost:8181/answer_from_table"
+
+OFF_TOPIC_QUESTIONS = [
+    "What is the capital of Australia ?",
+    "How do I change a flat tire ?",
+    "Who won the football world cup in 2018 ?",
+    "What is the best recipe for chocolate cake ?",
+    "How does a transformer neural network work ?",
+    "What time is it in Tokyo ?",
+    "How to learn to play the guitar ?",
+    "What are the rules of chess ?",
+]
+
+REPHRASINGS = [
+    "Can you tell me {q}",
+    "{q} Please explain simply.",
+    "I would like to know: {q}",
+]
+
+
+def build_queries(n: int, off_topic_ratio: float, seed: int) -> list[dict]:
+    """Questions MedQuAD (telles quelles ou reformulées) et questions hors sujet."""
+    rng = random.Random(seed)
+    df = pd.read_csv(MED_QUERY_CSV, sep=";", encoding="utf-8", on_bad_lines="warn", engine="python")
+    df.columns = df.columns.str.strip()
+    df = df.dropna(subset=["question", "answer"]).sample(n, random_state=seed)
+
+    queries = []
+    for _, row in df.iterrows():
+        question = str(row["question"]).strip()
+        if rng.random() < 0.5:
+            question = rng.choice(REPHRASINGS).format(q=question)
+        queries.append({"question": question, "expected": str(row["answer"]).strip()})
+
+    for _ in range(int(n * off_topic_ratio)):
+        queries.append({"question": rng.choice(OFF_TOPIC_QUESTIONS), "expected": None})
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--off-topic-ratio", type=float, default=0.2)
+    parser.add_argument("--thresholds", nargs="+", type=float, default=[0.3, 0.4, 0.5, 0.55, 0.6, 0.7])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", default=API_URL)
+    parser.add_argument("--output", help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    session = requests.Session()
+    rows = []
+    for query in build_queries(args.questions, args.off_topic_ratio, args.seed):
+        response = session.post(args.url, json={"question": query["question"]}, timeout=30)
+        if response.status_code != 200:
+            continue
+        body = response.json()
+        rows.append({
+            "distance": body["similarity_score"],
+            "confidence": body.get("confidence", "high"),
+            "match_type": body.get("match_type", "vector"),
+            "correct": query["expected"] is not None and body["answer"].strip() == query["expected"],
+        })
+
+    confidences = [row["confidence"] for row in rows]
+    low = confidences.count("low")
+    vector_rows = [row for row in rows if row["match_type"] == "vector"]
+    distances = np.array([row["distance"] for row in vector_rows])
+    correct = np.array([row["correct"] for row in vector_rows], dtype=bool)
+
+    sweep = []
+    for threshold in args.thresholds:
+        skipped = distances > threshold
+        sweep.append({
+            "threshold": threshold,
+            "skipped_rate": float(skipped.mean()) if len(distances) else 0.0,
+            "correct_skipped_rate": float((skipped & correct).sum() / max(correct.sum(), 1)),
+            "wrong_kept_rate": float((~skipped & ~correct).sum() / max((~correct).sum(), 1)),
+        })
+
+    write_results(args.output, {
+        "requests": len(rows),
+        "confidence": {level: confidences.count(level) for level in ("high", "medium", "low")},
+        "match_types": {t: sum(row["match_type"] == t for row in rows) for t in ("exact", "vector")},
+        "saved": {
+            "gemini_calls": low,
+            "tts_renders": 2 * low,
+            "downstream_work_rate": low / len(rows) if rows else 0.0,
+        },
+        "threshold_sweep": sweep,
+    })
+
+
+if __name__ == "__main__":
+    main()
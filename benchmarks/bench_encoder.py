@@ -0,0 +1,86 @@
+"""
+Benchmark des backends de l'encodeur de requêtes.
+
+Mesure, pour chaque backend et chaque taille de lot, la latence par lot et le
+débit, puis vérifie la parité avec PyTorch (dérive cosinus = 1 - cos).
+
+    python -m benchmarks.bench_encoder --backends torch onnx onnx-int8 --batch-sizes 1 8 32
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from benchmarks.common import load_questions, write_results
+from encoder import EMBEDDING_DIM, ENCODER_BACKENDS, get_encoder
+
+
+def time_batches(encoder, questions: list[str], batch_size: int, repeats: int) -> dict:
+    """Chronomètre l'encodage de lots de batch_size questions."""
+    batches = [questions[i:i + batch_size] for i in range(0, len(questions), batch_size)]
+    encoder.encode(batches[0], batch_size=batch_size)
+
+    latencies = []
+    for _ in range(repeats):
+        for batch in batches:
+            start = time.perf_counter()
+            encoder.encode(batch, batch_size=batch_size)
+            latencies.append(time.perf_counter() - start)
+
+    total = sum(latencies)
+    return {
+        "batch_size": batch_size,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": float(np.percentile(latencies, 95)) * 1000,
+        "throughput_per_s": len(batches) * repeats * batch_size / total,
+    }
+
+
+def parity(reference: np.ndarray, candidate: np.ndarray) -> dict:
+    """Dérive cosinus entre deux matrices d'embeddings normalisés."""
+    cosines = (reference * candidate).sum(axis=1) / (
+        np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+    )
+    drift = 1.0 - cosines
+    return {"mean_drift": float(drift.mean()), "max_drift": float(drift.max())}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"], choices=ENCODER_BACKENDS)
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument("--questions", type=int, default=256)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    questions = load_questions(args.questions)
+    load_times = {}
+
+    def load(backend):
+        start = time.perf_counter()
+        encoder = get_encoder(backend)
+        load_times.setdefault(backend, time.perf_counter() - start)
+        return encoder
+
+    reference = load("torch").encode(questions)
+
+    results = {"questions": len(questions), "backends": {}}
+    for backend in args.backends:
+        encoder = load(backend)
+
+        embeddings = encoder.encode(questions)
+        assert embeddings.shape == (len(questions), EMBEDDING_DIM), embeddings.shape
+
+        results["backends"][backend] = {
+            "load_s": load_times[backend],
+            "parity": parity(reference, embeddings),
+            "batches": [time_batches(encoder, questions, size, args.repeats) for size in args.batch_sizes],
+        }
+
+    write_results(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark du démarrage de l'API.
+
+Mesure le temps d'import de api.py, puis lance uvicorn et chronomètre :
+- le temps jusqu'à ce que /health/live réponde ;
+- le temps jusqu'à ce que /health/ready réponde (modèle chargé et chaud) ;
+- la latence de la première requête /answer_from_table.
+
+    python -m benchmarks.bench_startup --runs 3
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import requests
+
+from benchmarks.common import write_results
+
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import api; print(time.perf_counter() - t)"
+
+
+def measure_import() -> float:
+    output = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], capture_output=True, text=True, check=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def wait_for(url: str, deadline: float) -> float | None:
+    """Attend qu'une URL réponde 200 ; retourne l'instant atteint ou None."""
+    while time.perf_counter() < deadline:
+        try:
+            if requests.get(url, timeout=1).status_code == 200:
+                return time.perf_counter()
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.05)
+    return None
+
+
+def measure_server(port: int, timeout: float, extra_env: dict | None = None) -> dict:
+    env = {**os.environ, **(extra_env or {})}
+    host = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        deadline = start + timeout
+        live = wait_for(f"{host}/health/live", deadline)
+        ready = wait_for(f"{host}/health/ready", deadline)
+
+        first_start = time.perf_counter()
+        response = requests.post(
+            f"{host}/answer_from_table",
+            json={"question": "What are the symptoms of Diabetes ?"},
+            timeout=timeout,
+        )
+        first_end = time.perf_counter()
+        return {
+            "live_s": live - start if live else None,
+            "ready_s": ready - start if ready else None,
+            "first_response_ms": (first_end - first_start) * 1000,
+            "first_response_status": response.status_code,
+            "time_to_first_response_s": first_end - start,
+        }
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8199)
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--no-warmup", action="store_true", help="Désactive le lot de préchauffage")
+    parser.add_argument("--output", help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    env = {"MEDICLA_WARMUP": "0"} if args.no_warmup else {}
+    imports = [measure_import() for _ in range(args.runs)]
+    servers = [measure_server(args.port, args.timeout, env) for _ in range(args.runs)]
+
+    write_results(args.output, {
+        "warmup": not args.no_warmup,
+        "import_s_median": statistics.median(imports),
+        "runs": servers,
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""
+Suite de benchmarks hors ligne : ni Postgres, ni Gemini, ni réseau.
+
+L'API tourne dans le processus (TestClient) avec le backend de recherche
+"memory", l'encodeur "hash" (sans modèle) par défaut, un LLM factice et le
+fournisseur TTS "stub". Pour chaque taille de corpus (10k à 1M vecteurs) :
+- construction du store et mémoire (taille des embeddings, RSS du processus) ;
+- latence d'encodage des questions ;
+- latence de recherche, sans filtre et filtrée par focus_area / source ;
+- latence de bout en bout : /answer_from_table (à froid puis depuis le cache),
+  raffinement LLM factice et synthèse vocale en mode audio.
+
+Les résultats sont écrits dans benchmarks/results/<commit>.json et peuvent être
+comparés à ceux d'un autre commit avec --compare.
+
+    python -m benchmarks.bench_suite --sizes 10000 100000 1000000
+    MEDICLA_ENCODER_BACKEND=onnx-int8 python -m benchmarks.bench_suite --corpus medquad \
+        --compare benchmarks/results/abc1234.json
+"""
+import os
+
+# Configuration de l'API avant son import (lue au chargement des modules).
+os.environ.setdefault("MEDICLA_RETRIEVAL_BACKEND", "memory")
+os.environ.setdefault("MEDICLA_ENCODER_BACKEND", "hash")
+os.environ["MEDICLA_QUERY_LOG"] = ""
+os.environ["MEDICLA_WARMUP"] = "0"
+os.environ["MEDICLA_ANSWER_INDEX"] = ""
+os.environ["MEDICLA_HOT_QUESTIONS"] = ""
+
+import argparse
+import gc
+import json
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import psutil
+
+from benchmarks.common import MED_QUERY_CSV, load_questions, write_results
+from encoder import EMBEDDING_DIM, ENCODER_BACKEND, get_encoder
+
+
+RESULTS_DIR = os.path.join("benchmarks", "results")
+
+# Métriques comparées entre deux fichiers de résultats (--compare).
+COMPARED_METRICS = [
+    ("build_s", None),
+    ("rss_mb", None),
+    ("encode_ms", "p50"),
+    ("search_ms.unfiltered", "p50"),
+    ("search_ms.focus_area", "p50"),
+    ("search_ms.source", "p50"),
+    ("answer_ms.cold", "p50"),
+    ("answer_ms.cached", "p50"),
+    ("pipeline_ms.total", "p50"),
+]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def rss_mb() -> float:
+    return psutil.Process().memory_info().rss / 2**20
+
+
+def summarize(latencies: list[float]) -> dict:
+    """Percentiles en millisecondes d'une liste de durées en secondes."""
+    if not latencies:
+        return {}
+    return {
+        "p50": statistics.median(latencies) * 1000,
+        "p95": float(np.percentile(latencies, 95)) * 1000,
+        "mean": statistics.fmean(latencies) * 1000,
+    }
+
+
+def timed(fn, *args, **kwargs) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def plant_questions(store, encoder, questions: list[str], noise: float, seed: int) -> None:
+    """
+    Place des variantes bruitées des questions de test dans le corpus synthétique
+    pour que chaque recherche ait un vrai plus proche voisin.
+    """
+    rng = np.random.default_rng(seed)
+    planted = encoder.encode(questions).astype(np.float32)
+    planted += rng.standard_normal(planted.shape, dtype=np.float32) * noise / np.sqrt(planted.shape[1])
+    planted /= np.linalg.norm(planted, axis=1, keepdims=True)
+    rows = rng.choice(len(store), size=min(len(questions), len(store)), replace=False)
+    store.embeddings[rows] = planted[:len(rows)]
+
+
+def medquad_store(size: int, encoder, noise: float, seed: int, chunk_size: int = 50000):
+    """
+    Corpus échantillonné de med_query.csv : les contenus sont encodés une fois,
+    puis répétés avec un bruit gaussien jusqu'à atteindre la taille demandée.
+    """
+    from memory_store import METADATA_COLUMNS, InMemoryStore
+
+    df = pd.read_csv(MED_QUERY_CSV, sep=";", encoding="utf-8", on_bad_lines="warn", engine="python")
+    df.columns = df.columns.str.strip()
+    df = df.dropna(subset=["question", "answer"]).head(size)
+    base = pd.DataFrame({
+        "answer": df["answer"].astype(str).str.strip(),
+        "source": df["source"].fillna("").astype(str).str.strip(),
+        "focus_area": df["focus_area"].fillna("").astype(str).str.strip(),
+        "content": "Question: " + df["question"].astype(str).str.strip() + "\nAnswer: " + df["answer"].astype(str).str.strip(),
+    }).reset_index(drop=True)
+    base_embeddings = encoder.encode(base["content"].tolist()).astype(np.float32)
+
+    rng = np.random.default_rng(seed)
+    embeddings = np.empty((size, base_embeddings.shape[1]), dtype=np.float32)
+    for start in range(0, size, chunk_size):
+        positions = np.arange(start, min(start + chunk_size, size))
+        block = base_embeddings[positions % len(base)]
+        # Les copies (au-delà du CSV) sont bruitées, les originaux restent intacts.
+        copies = positions >= len(base)
+        block[copies] += rng.standard_normal((copies.sum(), block.shape[1]), dtype=np.float32) * noise / np.sqrt(block.shape[1])
+        embeddings[start:start + len(positions)] = block / np.linalg.norm(block, axis=1, keepdims=True)
+
+    metadata = base.iloc[np.arange(size) % len(base)].reset_index(drop=True)
+    metadata.insert(0, "id", np.arange(1, size + 1))
+    return InMemoryStore(embeddings, metadata[METADATA_COLUMNS])
+
+
+def stub_refine(text: str, language: str, latency_ms: float) -> str:
+    """LLM factice à la place de Gemini : latence fixe, texte reformaté."""
+    if latency_ms:
+        time.sleep(latency_ms / 1000)
+    return f"Réponse raffinée ({language}) : {text}"
+
+
+def wait_until_ready(client, timeout: float = 60.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while client.get("/health/ready").status_code != 200:
+        if time.perf_counter() > deadline:
+            raise TimeoutError("L'API n'est pas prête")
+        time.sleep(0.01)
+
+
+def bench_scale(size: int, args, encoder, questions: list[str]) -> dict:
+    import api
+    from audiovisuel import SilentStubProvider, generate_video
+    from cache import LRUCache
+    from coalesce import SingleFlight
+    from memory_store import InMemoryStore
+
+    needed = size * EMBEDDING_DIM * 4 * 1.2
+    available = psutil.virtual_memory().available
+    if needed > available:
+        print(f"[{size}] ignoré : ~{needed / 2**30:.1f} Go requis, {available / 2**30:.1f} Go disponibles")
+        return {"size": size, "skipped": "insufficient_memory"}
+
+    # Libère le store et les caches de la taille précédente avant la mesure RSS.
+    api.memory_store = None
+    api.embedding_cache = LRUCache(api.EMBEDDING_CACHE_SIZE)
+    api.answer_cache = LRUCache(api.ANSWER_CACHE_SIZE)
+    api.coalescer = SingleFlight()
+    gc.collect()
+    rss_before = rss_mb()
+
+    print(f"[{size}] construction du corpus {args.corpus}...")
+    if args.corpus == "medquad":
+        build_s, store = timed(medquad_store, size, encoder, args.noise, args.seed)
+    else:
+        build_s, store = timed(InMemoryStore.synthetic, size, EMBEDDING_DIM, seed=args.seed)
+        plant_questions(store, encoder, questions, args.noise, args.seed)
+    api.memory_store = store
+    rss_after = rss_mb()
+
+    # Encodage (sans cache), puis recherche directe dans le store.
+    encode_latencies, embeddings = [], []
+    for question in questions:
+        elapsed, embedding = timed(encoder.encode, question)
+        encode_latencies.append(elapsed)
+        embeddings.append(embedding)
+
+    top_focus_area = store.focus_areas(limit=1)[0]["focus_area"]
+    top_source = store.sources()[0]["source"]
+    search = {"unfiltered": {}, "focus_area": {"focus_area": top_focus_area}, "source": {"source": top_source}}
+    search_latencies = {name: [] for name in search}
+    queries = embeddings[:args.search_queries]
+    for name, filters in search.items():
+        for embedding in queries:
+            search_latencies[name].append(timed(store.search, embedding, 3, **filters)[0])
+
+    # Bout en bout : API (à froid puis cache de réponses), LLM factice, TTS stub.
+    from fastapi.testclient import TestClient
+
+    provider = SilentStubProvider()
+    cold, cached = [], []
+    pipeline = {"answer": [], "refine": [], "tts": [], "total": []}
+    confidences = []
+    with TestClient(api.app) as client, tempfile.TemporaryDirectory() as tmp:
+        wait_until_ready(client)
+        for i, question in enumerate(questions):
+            start = time.perf_counter()
+            response = client.post("/answer_from_table", json={"question": question})
+            answered = time.perf_counter()
+            response.raise_for_status()
+            body = response.json()
+            confidences.append(body["confidence"])
+
+            refined = stub_refine(body["answer"], "fr", args.llm_latency_ms)
+            refined_at = time.perf_counter()
+            if i < args.tts_queries:
+                generate_video(refined, language="fr", output_file=os.path.join(tmp, f"answer_{i}.wav"),
+                               mode="audio", provider=provider)
+            done = time.perf_counter()
+
+            cold.append(answered - start)
+            pipeline["answer"].append(answered - start)
+            pipeline["refine"].append(refined_at - answered)
+            if i < args.tts_queries:
+                pipeline["tts"].append(done - refined_at)
+                pipeline["total"].append(done - start)
+
+        for question in questions:
+            cached.append(timed(client.post, "/answer_from_table", json={"question": question})[0])
+
+    result = {
+        "size": size,
+        "build_s": build_s,
+        "store_mb": store.nbytes / 2**20,
+        "rss_mb": rss_after,
+        "rss_delta_mb": rss_after - rss_before,
+        "encode_ms": summarize(encode_latencies),
+        "search_ms": {name: summarize(latencies) for name, latencies in search_latencies.items()},
+        "answer_ms": {"cold": summarize(cold), "cached": summarize(cached)},
+        "pipeline_ms": {step: summarize(latencies) for step, latencies in pipeline.items()},
+        "confidence": {level: confidences.count(level) for level in ("high", "medium", "low")},
+    }
+    print(f"[{size}] recherche p50 {result['search_ms']['unfiltered']['p50']:.2f} ms, "
+          f"réponse p50 {result['answer_ms']['cold']['p50']:.2f} ms, RSS {rss_after:.0f} Mo")
+    return result
+
+
+def metric(scale: dict, path: str, stat: str | None):
+    value = scale
+    for part in path.split("."):
+        value = value.get(part, {}) if isinstance(value, dict) else {}
+    if stat:
+        value = value.get(stat) if isinstance(value, dict) else None
+    return value if isinstance(value, (int, float)) else None
+
+
+def compare(previous_path: str, results: dict) -> None:
+    """Affiche l'écart de chaque métrique par rapport à un précédent fichier de résultats."""
+    with open(previous_path, encoding="utf-8") as f:
+        previous = json.load(f)
+    previous_scales = {scale["size"]: scale for scale in previous.get("scales", [])}
+
+    print(f"\nComparaison {previous.get('commit', '?')} -> {results['commit']}")
+    for scale in results["scales"]:
+        before = previous_scales.get(scale["size"])
+        if not before or "skipped" in scale or "skipped" in before:
+            continue
+        print(f"\n  {scale['size']} vecteurs")
+        for path, stat in COMPARED_METRICS:
+            old, new = metric(before, path, stat), metric(scale, path, stat)
+            if old is None or new is None:
+                continue
+            delta = (new - old) / old * 100 if old else 0.0
+            label = path + (f".{stat}" if stat else "")
+            print(f"    {label:<26} {old:>10.2f} -> {new:>10.2f}  ({delta:+.1f} %)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10000, 100000, 1000000])
+    parser.add_argument("--corpus", choices=["synthetic", "medquad"], default="synthetic")
+    parser.add_argument("--questions", type=int, default=100)
+    parser.add_argument("--search-queries", type=int, default=50)
+    parser.add_argument("--tts-queries", type=int, default=10)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    parser.add_argument("--noise", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Fichier JSON de résultats (benchmarks/results/<commit>.json par défaut)")
+    parser.add_argument("--compare", help="Fichier de résultats d'un autre commit")
+    args = parser.parse_args()
+
+    if args.corpus == "medquad" and not os.path.exists(MED_QUERY_CSV):
+        parser.error(f"{MED_QUERY_CSV} introuvable : utilisez --corpus synthetic")
+
+    # Même instance que celle chargée par l'API (backend MEDICLA_ENCODER_BACKEND).
+    encoder = get_encoder()
+    questions = load_questions(args.questions, seed=args.seed)
+    commit = git_commit()
+
+    results = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {
+            "corpus": args.corpus,
+            "encoder": ENCODER_BACKEND,
+            "questions": args.questions,
+            "search_queries": args.search_queries,
+            "tts_queries": args.tts_queries,
+            "llm_latency_ms": args.llm_latency_ms,
+            "cpu_count": os.cpu_count(),
+            "total_memory_mb": psutil.virtual_memory().total / 2**20,
+        },
+        "scales": [bench_scale(size, args, encoder, questions) for size in args.sizes],
+    }
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{commit}.json")
+    write_results(output, results)
+    if args.compare:
+        compare(args.compare, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark mémoire du service multi-workers.
+
+Lance l'API avec N workers, soit via serve.py (modèle chargé une fois avant le
+fork), soit via uvicorn --workers (chaque worker charge son propre modèle),
+envoie quelques requêtes puis relève pour chaque worker :
+- rss : mémoire résidente (compte les pages partagées dans chaque worker) ;
+- pss : part proportionnelle des pages partagées (somme = mémoire réelle) ;
+- uss : pages privées du worker.
+
+    python -m benchmarks.bench_workers --workers 1 2 4 8
+"""
+import argparse
+import subprocess
+import sys
+import time
+
+import psutil
+import requests
+
+from benchmarks.common import load_questions, write_results
+
+
+def start_server(mode: str, workers: int, port: int) -> subprocess.Popen:
+    if mode == "prefork":
+        command = [sys.executable, "serve.py", "--workers", str(workers), "--port", str(port)]
+    else:
+        command = [sys.executable, "-m", "uvicorn", "api:app", "--workers", str(workers),
+                   "--port", str(port), "--log-level", "warning"]
+    return subprocess.Popen(command)
+
+
+def wait_until_ready(port: int, workers: int, timeout: float) -> None:
+    """Attend que /health/ready réponde 200 de façon répétée (tous les workers chauds)."""
+    deadline = time.perf_counter() + timeout
+    successes = 0
+    while successes < 4 * workers:
+        if time.perf_counter() > deadline:
+            raise TimeoutError("Les workers ne sont pas prêts")
+        try:
+            ok = requests.get(f"http://127.0.0.1:{port}/health/ready", timeout=1).status_code == 200
+        except requests.ConnectionError:
+            ok = False
+        successes = successes + 1 if ok else 0
+        time.sleep(0.05)
+
+
+def worker_memory(server: subprocess.Popen) -> list[dict]:
+    memory = []
+    for child in psutil.Process(server.pid).children(recursive=True):
+        info = child.memory_full_info()
+        memory.append({"pid": child.pid, "rss_mb": info.rss / 2**20,
+                       "pss_mb": info.pss / 2**20, "uss_mb": info.uss / 2**20})
+    return memory
+
+
+def measure(mode: str, workers: int, port: int, questions: list[str], timeout: float) -> dict:
+    server = start_server(mode, workers, port)
+    try:
+        wait_until_ready(port, workers, timeout)
+        for question in questions:
+            requests.post(f"http://127.0.0.1:{port}/answer_from_table", json={"question": question}, timeout=30)
+
+        memory = worker_memory(server)
+        parent = psutil.Process(server.pid).memory_full_info()
+        return {
+            "mode": mode,
+            "workers": workers,
+            "parent_pss_mb": parent.pss / 2**20,
+            "worker_rss_mb": sum(m["rss_mb"] for m in memory) / len(memory),
+            "worker_uss_mb": sum(m["uss_mb"] for m in memory) / len(memory),
+            "total_pss_mb": parent.pss / 2**20 + sum(m["pss_mb"] for m in memory),
+        }
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4])
+    parser.add_argument("--modes", nargs="+", default=["prefork", "uvicorn"], choices=["prefork", "uvicorn"])
+    parser.add_argument("--port", type=int, default=8198)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--output", help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    questions = load_questions(args.requests)
+    results = [measure(mode, workers, args.port, questions, args.timeout)
+               for mode in args.modes for workers in args.workers]
+    write_results(args.output, {"runs": results})
+
+
+if __name__ == "__main__":
+    main()
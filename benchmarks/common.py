@@ -0,0 +1,46 @@
+import json
+import os
+import random
+
+import pandas as pd
+
+
+MED_QUERY_CSV = "med_query.csv"
+
+FALLBACK_QUESTIONS = [
+    "What is (are) Glaucoma ?",
+    "What are the symptoms of Diabetes ?",
+    "How to prevent High Blood Pressure ?",
+    "What are the treatments for Asthma ?",
+    "Who is at risk for Heart Attack ?",
+    "What causes Kidney Disease ?",
+    "Is Parkinson's Disease inherited ?",
+    "How many people are affected by Alzheimer's Disease ?",
+]
+
+
+def load_questions(n: int, csv_path: str = MED_QUERY_CSV, seed: int = 0) -> list[str]:
+    """
+    Échantillonne n questions de med_query.csv.
+
+    Sans le CSV (machine hors ligne), des variantes des questions MedQuAD
+    typiques sont générées pour que les benchmarks restent exécutables.
+    """
+    if os.path.exists(csv_path):
+        df = pd.read_csv(csv_path, sep=";", encoding="utf-8", on_bad_lines="warn", engine="python")
+        df.columns = df.columns.str.strip()
+        questions = df["question"].dropna().astype(str).tolist()
+        rng = random.Random(seed)
+        return [rng.choice(questions) for _ in range(n)] if n > len(questions) else rng.sample(questions, n)
+
+    rng = random.Random(seed)
+    return [f"{rng.choice(FALLBACK_QUESTIONS)} ({i})" for i in range(n)]
+
+
+def write_results(path: str | None, results: dict) -> None:
+    """Affiche les résultats et les écrit en JSON si un chemin est fourni."""
+    print(json.dumps(results, indent=2))
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Résultats écrits dans {path}")
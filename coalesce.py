@@ -0,0 +1,43 @@
+import asyncio
+from collections.abc import Callable, Hashable
+
+from fastapi.concurrency import run_in_threadpool
+
+
+class SingleFlight:
+    """
+    Regroupe les appels concurrents identiques sur un seul calcul en cours.
+
+    Le premier appel pour une clé lance le calcul (bloquant) dans le pool de
+    threads ; les appels suivants arrivant avant la fin attendent ce même calcul
+    et reçoivent son résultat ou son exception. La clé est libérée dès la fin du
+    calcul : rien n'est mis en cache au-delà.
+    """
+
+    def __init__(self):
+        self._in_flight: dict[Hashable, asyncio.Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable, *args):
+        task = self._in_flight.get(key)
+        if task is None:
+            self.leaders += 1
+            # Tâche indépendante de la requête meneuse : si son client se
+            # déconnecte, les requêtes en attente reçoivent quand même le résultat.
+            task = asyncio.ensure_future(run_in_threadpool(fn, *args))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        total = self.leaders + self.coalesced
+        return {
+            "requests": total,
+            "computations": self.leaders,
+            "coalesced": self.coalesced,
+            "coalesced_rate": self.coalesced / total if total else 0.0,
+            "in_flight": len(self._in_flight),
+        }
@@ -0,0 +1,180 @@
+import hashlib
+import os
+from functools import lru_cache
+
+import numpy as np
+
+
+MODEL_NAME = "sentence-transformers/all-mpnet-base-v2"
+EMBEDDING_DIM = 768
+MAX_SEQ_LENGTH = 384
+
+ENCODER_BACKEND = os.getenv("MEDICLA_ENCODER_BACKEND", "torch")
+ONNX_DIR = os.getenv("MEDICLA_ONNX_DIR", "onnx_model")
+ONNX_THREADS = int(os.getenv("MEDICLA_ONNX_THREADS", "0"))
+
+ENCODER_BACKENDS = ("torch", "onnx", "onnx-int8", "hash")
+
+
+class TorchEncoder:
+    """Encodeur de référence : SentenceTransformer exécuté par PyTorch."""
+
+    name = "torch"
+
+    def __init__(self, model_name: str = MODEL_NAME, device: str | None = None):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device=device)
+
+    def encode(self, texts: str | list[str], batch_size: int = 32) -> np.ndarray:
+        return self.model.encode(texts, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False)
+
+
+def export_onnx(model_name: str = MODEL_NAME, output_dir: str = ONNX_DIR, quantize: bool = False) -> str:
+    """
+    Exporte le transformer de all-mpnet-base-v2 au format ONNX.
+
+    Seul le transformer est exporté ; le mean pooling et la normalisation L2 du
+    SentenceTransformer sont refaits en numpy par OnnxEncoder.
+
+    Args:
+        model_name (str): Modèle Hugging Face à exporter.
+        output_dir (str): Dossier de sortie (modèle ONNX + tokenizer).
+        quantize (bool): Produit en plus model_int8.onnx (quantification dynamique int8).
+
+    Returns:
+        str: Chemin du modèle ONNX à charger.
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    os.makedirs(output_dir, exist_ok=True)
+    model_path = os.path.join(output_dir, "model.onnx")
+
+    if not os.path.exists(model_path):
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModel.from_pretrained(model_name).eval()
+        tokenizer.save_pretrained(output_dir)
+
+        sample = tokenizer(["What is (are) Glaucoma ?"], return_tensors="pt")
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                (sample["input_ids"], sample["attention_mask"]),
+                model_path,
+                input_names=["input_ids", "attention_mask"],
+                output_names=["token_embeddings"],
+                dynamic_axes={
+                    "input_ids": {0: "batch", 1: "sequence"},
+                    "attention_mask": {0: "batch", 1: "sequence"},
+                    "token_embeddings": {0: "batch", 1: "sequence"},
+                },
+                opset_version=17,
+            )
+        print(f"Modèle exporté dans {model_path}")
+
+    if not quantize:
+        return model_path
+
+    quantized_path = os.path.join(output_dir, "model_int8.onnx")
+    if not os.path.exists(quantized_path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(model_path, quantized_path, weight_type=QuantType.QInt8)
+        print(f"Modèle quantifié dans {quantized_path}")
+    return quantized_path
+
+
+class OnnxEncoder:
+    """Encodeur ONNX Runtime (CPU), optionnellement quantifié en int8."""
+
+    def __init__(self, model_dir: str = ONNX_DIR, quantized: bool = False, intra_op_threads: int = ONNX_THREADS):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.name = "onnx-int8" if quantized else "onnx"
+        model_path = export_onnx(output_dir=model_dir, quantize=quantized)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.intra_op_num_threads = intra_op_threads or os.cpu_count() or 1
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+
+    def encode(self, texts: str | list[str], batch_size: int = 32) -> np.ndarray:
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+
+        embeddings = []
+        for i in range(0, len(texts), batch_size):
+            tokens = self.tokenizer(
+                texts[i:i + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=MAX_SEQ_LENGTH,
+                return_tensors="np",
+            )
+            token_embeddings = self.session.run(None, {
+                "input_ids": tokens["input_ids"].astype(np.int64),
+                "attention_mask": tokens["attention_mask"].astype(np.int64),
+            })[0]
+
+            mask = tokens["attention_mask"][..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            embeddings.append(pooled.astype(np.float32))
+
+        embeddings = np.vstack(embeddings)
+        return embeddings[0] if single else embeddings
+
+
+class HashEncoder:
+    """
+    Encodeur sans modèle pour les benchmarks hors ligne : hachage des 3-grammes
+    de caractères vers 768 dimensions, puis normalisation L2.
+
+    Déterministe et quasi instantané, il ne mesure pas la qualité des réponses
+    mais permet de faire tourner l'API sans télécharger all-mpnet-base-v2.
+    """
+
+    name = "hash"
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+
+    def _encode_one(self, text: str) -> np.ndarray:
+        text = f" {text.lower()} "
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for i in range(len(text) - 2):
+            digest = hashlib.blake2b(text[i:i + 3].encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little")
+            vector[bucket % self.dim] += 1.0 if digest[4] & 1 else -1.0
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+    def encode(self, texts: str | list[str], batch_size: int = 32) -> np.ndarray:
+        if isinstance(texts, str):
+            return self._encode_one(texts)
+        return np.vstack([self._encode_one(text) for text in texts]) if texts else np.empty((0, self.dim), np.float32)
+
+
+@lru_cache(maxsize=None)
+def get_encoder(backend: str = ENCODER_BACKEND, device: str | None = None):
+    """
+    Retourne l'encodeur de requêtes (768 dimensions) pour le backend demandé.
+
+    Le backend par défaut est lu dans MEDICLA_ENCODER_BACKEND : "torch",
+    "onnx", "onnx-int8" ou "hash" (benchmarks hors ligne). Une seule instance
+    est créée par backend.
+    """
+    if backend == "torch":
+        return TorchEncoder(device=device)
+    if backend == "onnx":
+        return OnnxEncoder()
+    if backend == "onnx-int8":
+        return OnnxEncoder(quantized=True)
+    if backend == "hash":
+        return HashEncoder()
+    raise ValueError(f"Backend d'encodeur '{backend}' inconnu. Choisissez parmi : {', '.join(ENCODER_BACKENDS)}.")
@@ -3,13 +3,13 @@ import requests
 import random
 import time
 from sklearn.metrics.pairwise import cosine_similarity
-from sentence_transformers import SentenceTransformer
+from encoder import get_encoder
 
 df = pd.read_csv("med_query.csv", sep=";", encoding="utf-8", on_bad_lines="warn", engine="python")
 
 sample_df = df.sample(10)
 
-model = SentenceTransformer("all-mpnet-base-v2")
+model = get_encoder()
 
 API_URL = "http://localhost:8181/answer_from_table"
 
@@ -0,0 +1,83 @@
+"""
+Analyse hors ligne du journal des requêtes : questions les plus fréquentes.
+
+Lit query_log.jsonl et écrit hot_questions.json. Au démarrage, l'API encode ces
+questions en un seul lot et précalcule leurs réponses (caches d'embeddings et
+de réponses) pour qu'elles soient servies sans encodeur ni base de données.
+
+    python hot_questions.py --top 200
+"""
+import argparse
+import json
+from collections import Counter, defaultdict
+
+from query_log import QUERY_LOG_PATH
+
+
+HOT_QUESTIONS_PATH = "hot_questions.json"
+
+
+def compute_hot_questions(log_path: str = QUERY_LOG_PATH, top: int = 200, min_count: int = 2) -> list[dict]:
+    """
+    Agrège le journal par (question normalisée, filtres).
+
+    Returns:
+        list[dict]: Les questions les plus fréquentes avec leur forme brute la
+        plus fréquente (celle qu'encode le préchauffage), leur nombre
+        d'occurrences, leur latence moyenne et la part servie par l'index exact.
+    """
+    counts = Counter()
+    raw_forms = defaultdict(Counter)
+    latencies = defaultdict(list)
+    fast_path = Counter()
+    with open(log_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if entry.get("endpoint") != "answer" or not entry.get("question"):
+                continue
+            key = (entry["question"], entry.get("focus_area"), entry.get("source"))
+            counts[key] += 1
+            raw_forms[key][entry.get("raw_question") or entry["question"]] += 1
+            latencies[key].append(entry.get("latency_ms", {}).get("total", 0.0))
+            if entry.get("match_type") in ("exact", "near", "cached"):
+                fast_path[key] += 1
+
+    hot = []
+    for (question, focus_area, source), count in counts.most_common(top):
+        if count < min_count:
+            break
+        key = (question, focus_area, source)
+        hot.append({
+            "question": question,
+            "raw_question": raw_forms[key].most_common(1)[0][0],
+            "focus_area": focus_area,
+            "source": source,
+            "count": count,
+            "mean_latency_ms": sum(latencies[key]) / len(latencies[key]),
+            "fast_path_rate": fast_path[key] / count,
+        })
+    return hot
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log", default=QUERY_LOG_PATH)
+    parser.add_argument("--output", default=HOT_QUESTIONS_PATH)
+    parser.add_argument("--top", type=int, default=200)
+    parser.add_argument("--min-count", type=int, default=2)
+    args = parser.parse_args()
+
+    hot = compute_hot_questions(args.log, args.top, args.min_count)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(hot, f, indent=2, ensure_ascii=False)
+
+    print(f"{len(hot)} questions fréquentes écrites dans {args.output}")
+    for entry in hot[:10]:
+        print(f"{entry['count']:>6}  {entry['mean_latency_ms']:>8.1f} ms  {entry['question']}")
+
+
+if __name__ == "__main__":
+    main()
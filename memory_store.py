@@ -0,0 +1,144 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+
+METADATA_COLUMNS = ["id", "answer", "source", "focus_area", "content"]
+
+SYNTHETIC_SOURCES = ["CancerGov", "GARD", "GHR", "MPlusHealthTopics", "NIDDK", "NINDS", "SeniorHealth", "NHLBI", "CDC"]
+
+
+class InMemoryStore:
+    """
+    Alternative en mémoire à qa_table (pgvector) : même recherche cosinus exacte
+    et mêmes filtres focus_area / source, sur une matrice numpy d'embeddings
+    normalisés.
+
+    Sauvegardée sur disque, la matrice est rechargée en mmap : avec serve.py,
+    tous les workers partagent les mêmes pages via le cache du système.
+    """
+
+    chunk_size = 65536
+
+    def __init__(self, embeddings: np.ndarray, metadata: pd.DataFrame):
+        if len(embeddings) != len(metadata):
+            raise ValueError("embeddings et metadata doivent avoir le même nombre de lignes")
+        self.embeddings = embeddings
+        metadata = metadata.reset_index(drop=True)
+        self._columns = {column: metadata[column].tolist() for column in METADATA_COLUMNS}
+        self._by_focus_area = {k: np.asarray(v) for k, v in metadata.groupby("focus_area").indices.items()}
+        self._by_source = {k: np.asarray(v) for k, v in metadata.groupby("source").indices.items()}
+
+    def __len__(self) -> int:
+        return len(self.embeddings)
+
+    @property
+    def nbytes(self) -> int:
+        return self.embeddings.nbytes
+
+    @classmethod
+    def from_records(cls, records: list[dict], embeddings: np.ndarray) -> "InMemoryStore":
+        """Construit le store à partir des lignes de qa_table et de leurs embeddings."""
+        embeddings = np.array(embeddings, dtype=np.float32)
+        embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return cls(embeddings, pd.DataFrame(records)[METADATA_COLUMNS])
+
+    @classmethod
+    def synthetic(cls, size: int, dim: int = 768, focus_areas: int = 2000, seed: int = 0,
+                  chunk_size: int = 50000) -> "InMemoryStore":
+        """
+        Corpus synthétique de taille arbitraire pour les benchmarks hors ligne.
+
+        Les vecteurs sont aléatoires, normalisés et générés par blocs. Les focus
+        areas suivent une loi de Zipf, comme dans MedQuAD où quelques maladies
+        concentrent beaucoup de questions.
+        """
+        rng = np.random.default_rng(seed)
+        embeddings = np.empty((size, dim), dtype=np.float32)
+        for start in range(0, size, chunk_size):
+            block = rng.standard_normal((min(chunk_size, size - start), dim), dtype=np.float32)
+            block /= np.linalg.norm(block, axis=1, keepdims=True)
+            embeddings[start:start + len(block)] = block
+
+        areas = (rng.zipf(1.3, size) - 1) % focus_areas
+        sources = rng.integers(0, len(SYNTHETIC_SOURCES), size)
+        metadata = pd.DataFrame({
+            "id": np.arange(1, size + 1),
+            "answer": [f"Synthetic answer {i}" for i in range(size)],
+            "source": [SYNTHETIC_SOURCES[s] for s in sources],
+            "focus_area": [f"Condition {a}" for a in areas],
+            "content": [f"Question: synthetic question {i}\nAnswer: Synthetic answer {i}" for i in range(size)],
+        })
+        return cls(embeddings, metadata)
+
+    def save(self, path: str) -> None:
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "embeddings.npy"), np.ascontiguousarray(self.embeddings, dtype=np.float32))
+        pd.DataFrame(self._columns).to_pickle(os.path.join(path, "metadata.pkl"))
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "InMemoryStore":
+        embeddings = np.load(os.path.join(path, "embeddings.npy"), mmap_mode="r" if mmap else None)
+        return cls(embeddings, pd.read_pickle(os.path.join(path, "metadata.pkl")))
+
+    def _candidate_rows(self, focus_area: str | None, source: str | None) -> np.ndarray | None:
+        rows = None
+        if focus_area:
+            rows = self._by_focus_area.get(focus_area, np.empty(0, dtype=np.int64))
+        if source:
+            by_source = self._by_source.get(source, np.empty(0, dtype=np.int64))
+            rows = by_source if rows is None else np.intersect1d(rows, by_source, assume_unique=True)
+        return rows
+
+    def search(self, query_embedding, limit: int, focus_area: str | None = None, source: str | None = None,
+               max_distance: float | None = None) -> list[dict]:
+        """
+        Les limit lignes les plus proches (distance cosinus croissante), au même
+        format que les lignes renvoyées par la requête SQL de api.py.
+        """
+        query = np.array(query_embedding, dtype=np.float32)
+        query /= max(float(np.linalg.norm(query)), 1e-12)
+
+        rows = self._candidate_rows(focus_area, source)
+        if rows is not None and not len(rows):
+            return []
+        if rows is None:
+            distances = 1.0 - self.embeddings @ query
+        else:
+            # Extraction par blocs : la copie d'une grande tranche filtrée ne
+            # double jamais la mémoire occupée par la matrice.
+            distances = 1.0 - np.concatenate([self.embeddings[rows[i:i + self.chunk_size]] @ query
+                                              for i in range(0, len(rows), self.chunk_size)])
+
+        k = min(limit, len(distances))
+        top = np.argpartition(distances, k - 1)[:k] if k < len(distances) else np.arange(len(distances))
+        top = top[np.argsort(distances[top], kind="stable")]
+        if max_distance is not None:
+            top = top[distances[top] < max_distance]
+
+        results = []
+        for position in top:
+            row = int(position if rows is None else rows[position])
+            result = {column: values[row] for column, values in self._columns.items()}
+            result["id"] = int(result["id"])
+            result["similarity"] = float(distances[position])
+            results.append(result)
+        return results
+
+    def focus_areas(self, source: str | None = None, limit: int = 100) -> list[dict]:
+        """Facettes focus_area -> nombre de lignes, comme l'endpoint /focus_areas."""
+        if source:
+            rows = self._by_source.get(source, [])
+            counts = pd.Series([self._columns["focus_area"][row] for row in rows], dtype=object).value_counts()
+        else:
+            counts = pd.Series({area: len(rows) for area, rows in self._by_focus_area.items()}, dtype=np.int64)
+        counts = counts[counts.index != ""]
+        counts = counts.sort_index().sort_values(ascending=False, kind="stable")
+        return [{"focus_area": area, "count": int(count)} for area, count in counts.head(limit).items()]
+
+    def sources(self) -> list[dict]:
+        """Nombre de lignes par source, de la plus fréquente à la moins fréquente."""
+        counts = sorted(((source, len(rows)) for source, rows in self._by_source.items() if source),
+                        key=lambda item: (-item[1], item[0]))
+        return [{"source": source, "count": count} for source, count in counts]
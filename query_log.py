@@ -0,0 +1,102 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+QUERY_LOG_PATH = os.getenv("MEDICLA_QUERY_LOG", "query_log.jsonl")
+
+_STOP = object()
+
+
+class QueryLogger:
+    """
+    Journal asynchrone des requêtes, sans impact sur la latence de l'API.
+
+    log() dépose l'entrée dans une file bornée et rend la main immédiatement ;
+    si la file est pleine l'entrée est abandonnée (et comptée) plutôt que de
+    bloquer la requête. Un thread d'arrière-plan écrit les entrées par lots
+    dans un fichier JSONL en ajout seul.
+    """
+
+    def __init__(self, path: str = QUERY_LOG_PATH, max_queue: int = 10000,
+                 batch_size: int = 256, flush_interval: float = 1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread: threading.Thread | None = None
+        self.written = 0
+        self.dropped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def start(self) -> None:
+        """Démarre le thread d'écriture (à faire dans chaque worker, après le fork)."""
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        self._thread = threading.Thread(target=self._run, name="query-log", daemon=True)
+        self._thread.start()
+
+    def log(self, entry: dict) -> None:
+        if not self.enabled:
+            return
+        entry.setdefault("ts", time.time())
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Vide la file puis arrête le thread d'écriture."""
+        if not self._thread:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                entry = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                entry = None
+
+            stop = entry is _STOP
+            if entry is not None and not stop:
+                batch.append(entry)
+            if batch and (stop or len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._write(batch)
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+            if stop:
+                return
+
+    def _write(self, batch: list[dict]) -> None:
+        lines = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in batch)
+        try:
+            # Une seule écriture en mode ajout par lot : les workers d'un même
+            # nœud peuvent partager le fichier sans entrelacer leurs lignes.
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+            self.written += len(batch)
+        except OSError:
+            logger.exception("Impossible d'écrire le journal des requêtes %s", self.path)
+            self.dropped += len(batch)
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+        }
@@ -0,0 +1,123 @@
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from answer_index import normalize_question
+from cache import LRUCache
+
+
+RERANK_MODEL = os.getenv("MEDICLA_RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_BUDGET_MS = float(os.getenv("MEDICLA_RERANK_BUDGET_MS", "150"))
+RERANK_CACHE_SIZE = int(os.getenv("MEDICLA_RERANK_CACHE_SIZE", "16384"))
+RERANK_MAX_PENDING = int(os.getenv("MEDICLA_RERANK_MAX_PENDING", "2"))
+
+
+class CrossEncoderReranker:
+    """
+    Re-classement des candidats du bi-encodeur par un petit cross-encoder CPU.
+
+    Toutes les paires (question, candidat) non encore en cache sont scorées en
+    une seule passe batchée. Le calcul tourne dans un thread dédié avec un budget
+    de temps par requête : s'il est dépassé, l'ordre du bi-encodeur est renvoyé
+    tel quel. Un calcul pas encore commencé est alors annulé ; un calcul en cours
+    se termine et remplit le cache. Au-delà de max_pending calculs en attente ou
+    en cours, les requêtes repartent directement dans l'ordre du bi-encodeur, pour
+    que la file ne consomme pas le budget des suivantes.
+    """
+
+    def __init__(self, model_name: str = RERANK_MODEL, cache_size: int = RERANK_CACHE_SIZE,
+                 max_pending: int = RERANK_MAX_PENDING):
+        self.model_name = model_name
+        self.cache = LRUCache(cache_size)
+        self.max_pending = max_pending
+        self._model = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        # Créé au premier re-classement : aucun thread n'existe avant un fork (serve.py).
+        self._executor: ThreadPoolExecutor | None = None
+        self.reranked = 0
+        self.fallbacks = 0
+        self.cancelled = 0
+        self.rejected = 0
+
+    def load(self) -> None:
+        with self._lock:
+            if self._model is None:
+                from sentence_transformers import CrossEncoder
+
+                self._model = CrossEncoder(self.model_name, device="cpu", max_length=256)
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    @staticmethod
+    def _pair_key(normalized: str, text: str) -> tuple:
+        return normalized, hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def score(self, question: str, texts: list[str]) -> list[float]:
+        """Scores de pertinence des textes pour la question (cache par paire)."""
+        normalized = normalize_question(question)
+        keys = [self._pair_key(normalized, text) for text in texts]
+        scores = [self.cache.get(key) for key in keys]
+
+        missing = [i for i, score in enumerate(scores) if score is None]
+        if missing:
+            self.load()
+            predicted = self._model.predict([(question, texts[i]) for i in missing],
+                                            batch_size=len(missing), show_progress_bar=False)
+            for i, score in zip(missing, predicted):
+                scores[i] = float(score)
+                self.cache.put(keys[i], scores[i])
+        return scores
+
+    def rerank(self, question: str, candidates: list[dict], text_key: str = "content",
+               budget_ms: float = RERANK_BUDGET_MS) -> tuple[list[dict], bool]:
+        """
+        Re-classe les candidats par score décroissant du cross-encoder.
+
+        Returns:
+            (candidats, True) re-classés avec leur "rerank_score", ou
+            (candidats dans l'ordre d'origine, False) si le budget est dépassé.
+        """
+        if len(candidates) < 2:
+            return candidates, False
+        # Chargement hors budget : sinon les premières requêtes de chaque worker
+        # dépasseraient toutes le budget pendant le chargement du modèle.
+        self.load()
+
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                self.fallbacks += 1
+                return candidates, False
+            self._pending += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rerank")
+
+        future = self._executor.submit(self.score, question, [c[text_key] or "" for c in candidates])
+        future.add_done_callback(self._release)
+        try:
+            scores = future.result(timeout=budget_ms / 1000)
+        except TimeoutError:
+            if future.cancel():
+                self.cancelled += 1
+            self.fallbacks += 1
+            return candidates, False
+
+        self.reranked += 1
+        ranked = sorted(zip(scores, range(len(candidates))), key=lambda pair: -pair[0])
+        return [{**candidates[i], "rerank_score": score} for score, i in ranked], True
+
+    def stats(self) -> dict:
+        return {
+            "model": self.model_name,
+            "loaded": self._model is not None,
+            "reranked": self.reranked,
+            "fallbacks": self.fallbacks,
+            "cancelled": self.cancelled,
+            "rejected": self.rejected,
+            "pending": self._pending,
+            "pair_cache": self.cache.stats(),
+        }
@@ -0,0 +1,139 @@
+"""
+Service multi-processus de l'API avec un modèle partagé entre workers.
+
+Le processus parent charge l'encodeur et l'index de réponses une seule fois,
+gèle le ramasse-miettes puis fork les workers : les poids restent partagés en
+copy-on-write au lieu d'être dupliqués (~420 Mo par worker avec mpnet).
+
+    python serve.py --workers 8 --port 8181
+"""
+import os
+
+# Un thread de calcul par worker : autant de workers que de cœurs, et aucun pool
+# de threads OpenMP / ONNX Runtime créé avant le fork (il ne survivrait pas au fork).
+os.environ.setdefault("MEDICLA_ONNX_THREADS", "1")
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+os.environ.setdefault("MKL_NUM_THREADS", "1")
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+import argparse
+import gc
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+
+import api
+from encoder import ENCODER_BACKEND
+
+
+# Un worker arrêté moins de FAST_FAILURE_S secondes après son lancement compte
+# comme un échec au démarrage : redémarrage avec un délai croissant, puis arrêt
+# du service après MAX_FAST_FAILURES échecs consécutifs (configuration invalide).
+FAST_FAILURE_S = 10.0
+MAX_FAST_FAILURES = 5
+MAX_BACKOFF_S = 30.0
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def preload() -> None:
+    """Charge et préchauffe les ressources dans le parent, avant le fork."""
+    if ENCODER_BACKEND == "torch":
+        import torch
+        torch.set_num_threads(1)
+
+    start = time.perf_counter()
+    api.load_resources()
+    print(f"Ressources préchargées en {time.perf_counter() - start:.1f} s (pid {os.getpid()})")
+
+    # Les objets déjà chargés ne seront plus parcourus par le GC : leurs pages
+    # restent partagées au lieu d'être recopiées dans chaque worker.
+    gc.collect()
+    gc.freeze()
+
+
+def run_worker(sock: socket.socket, log_level: str) -> None:
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    config = uvicorn.Config(api.app, log_level=log_level, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+    os._exit(0)
+
+
+def spawn(sock: socket.socket, log_level: str, started: dict) -> int:
+    pid = os.fork()
+    if pid == 0:
+        run_worker(sock, log_level)
+    started[pid] = time.monotonic()
+    return pid
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8181)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--log-level", default="warning")
+    args = parser.parse_args()
+
+    preload()
+    sock = bind_socket(args.host, args.port)
+    started = {}
+    workers = {spawn(sock, args.log_level, started) for _ in range(args.workers)}
+    print(f"{len(workers)} workers à l'écoute sur {args.host}:{args.port}")
+
+    stopping = False
+    fast_failures = 0
+    exit_code = 0
+
+    def stop(signum, _frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        workers.discard(pid)
+        if stopping:
+            continue
+
+        uptime = time.monotonic() - started.pop(pid, 0.0)
+        fast_failures = fast_failures + 1 if uptime < FAST_FAILURE_S else 0
+        if fast_failures >= MAX_FAST_FAILURES:
+            print(f"{fast_failures} workers arrêtés au démarrage d'affilée, arrêt du service", file=sys.stderr)
+            stop(signal.SIGTERM, None)
+            exit_code = 1
+            continue
+
+        delay = min(MAX_BACKOFF_S, 0.5 * 2 ** fast_failures) if fast_failures else 0.0
+        print(f"Worker {pid} arrêté (statut {status}) après {uptime:.1f} s, redémarrage"
+              + (f" dans {delay:.1f} s" if delay else ""))
+        time.sleep(delay)
+        if not stopping:
+            workers.add(spawn(sock, args.log_level, started))
+
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()